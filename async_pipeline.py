@@ -0,0 +1,288 @@
+"""Asyncio-native capture → preprocess → OCR → publish pipeline.
+
+Each feed runs its own capture and preprocess coroutines connected by bounded
+``asyncio.Queue`` objects, so a full queue pauses the stage in front of it
+(backpressure) instead of buffering frames without limit. Blocking work
+(frame grabbing, cropping, EasyOCR, file writes) is offloaded to thread pool
+executors. OCR slots are shared through a FIFO semaphore and every feed is
+capped at ``FeedConfig.ocr_concurrency`` in-flight jobs, so one slow feed
+cannot starve the others. Grab, crop and publish calls share the io executor
+the same way: each feed holds at most ``FeedConfig.io_concurrency`` of its
+threads, so a hung grab or slow publish on one feed leaves the rest of the
+io pool to the other feeds. Frames are numbered per feed at capture, and a
+result that finishes after a newer frame of the same feed was applied is
+dropped (counted in ``FeedStats.stale``), so results and change events never
+go back in time. A ``CycleProfiler`` passed as ``profiler`` starts
+with the pipeline and counts every finished OCR result as one cycle; use its
+sampling mode here, since the OCR itself runs on executor threads.
+
+Example::
+
+    pipeline = AsyncOCRPipeline(processor, [FeedConfig("cam1", capture.get_latest_frame, boxes)])
+    async for item in pipeline.results():
+        print(item.feed, item.result.to_json(compact=True))
+"""
+
+import asyncio
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from memory_guard import LEVEL_REDUCE_DECODE, MemoryGuard
+from ocr_events import ChangeTracker, TextChangeEvent
+from ocr_pipeline import BoxConfig, OCRProcessor, OCRSessionResult
+from profiling import CycleProfiler
+
+
+@dataclass
+class FeedConfig:
+    """One capture source and the boxes to read from it.
+
+    ``grab`` is any blocking callable returning the newest frame (or ``None``
+    when nothing is available yet), e.g. ``CaptureManager.grab_frame`` or
+    ``SRTStreamCapture.get_latest_frame``. ``pts`` optionally returns the
+    presentation timestamp of that frame (e.g. ``lambda: capture.latest_pts``)
+    and is copied onto change events.
+    """
+
+    name: str
+    grab: Callable[[], Optional[Image.Image]]
+    bboxes: List[Tuple[int, int, int, int]]
+    monitor_index: int = 0
+    interval: float = 1.0
+    ocr_concurrency: int = 1
+    io_concurrency: int = 1
+    box_configs: Optional[List[Optional[BoxConfig]]] = None
+    pts: Optional[Callable[[], Optional[float]]] = None
+
+
+@dataclass
+class FeedStats:
+    frames: int = 0
+    results: int = 0
+    stale: int = 0
+    errors: int = 0
+    last_error: Optional[str] = None
+
+
+@dataclass
+class FeedResult:
+    feed: str
+    result: OCRSessionResult
+    events: List[TextChangeEvent] = field(default_factory=list)
+
+
+@dataclass
+class FeedEvent:
+    feed: str
+    event: TextChangeEvent
+
+
+@dataclass
+class _FeedRuntime:
+    config: FeedConfig
+    preprocess_queue: "asyncio.Queue"
+    ocr_queue: "asyncio.Queue"
+    io_slots: asyncio.Semaphore
+    stats: FeedStats = field(default_factory=FeedStats)
+    seq: int = 0
+    last_applied: int = 0
+
+
+class AsyncOCRPipeline:
+    """Run several feeds through OCR concurrently and yield results as they finish."""
+
+    def __init__(
+        self,
+        processor: OCRProcessor,
+        feeds: List[FeedConfig],
+        queue_size: int = 1,
+        ocr_workers: int = 2,
+        io_workers: int = 4,
+        publish: Optional[Callable[[str, OCRSessionResult], None]] = None,
+        memory_guard: Optional[MemoryGuard] = None,
+        degraded_interval_factor: float = 2.0,
+        profiler: Optional[CycleProfiler] = None,
+    ) -> None:
+        self.processor = processor
+        self.feeds = feeds
+        self.queue_size = queue_size
+        self.ocr_workers = ocr_workers
+        self.io_workers = io_workers
+        self.publish = publish
+        self.memory_guard = memory_guard
+        self.degraded_interval_factor = degraded_interval_factor
+        self.profiler = profiler
+        self.stats: Dict[str, FeedStats] = {}
+        self.trackers: Dict[str, ChangeTracker] = {feed.name: ChangeTracker() for feed in feeds}
+        self._runtimes: List[_FeedRuntime] = []
+        self._tasks: List[asyncio.Task] = []
+        self._results: Optional[asyncio.Queue] = None
+        self._ocr_slots: Optional[asyncio.Semaphore] = None
+        self._io_executor: Optional[ThreadPoolExecutor] = None
+        self._ocr_executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._io_executor = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="ocr-io")
+        self._ocr_executor = ThreadPoolExecutor(max_workers=self.ocr_workers, thread_name_prefix="ocr-run")
+        self._ocr_slots = asyncio.Semaphore(self.ocr_workers)
+        self._results = asyncio.Queue(maxsize=max(1, self.queue_size * len(self.feeds)))
+        if self.profiler:
+            self.profiler.watch(self.processor)
+            self.profiler.start()
+        for feed in self.feeds:
+            runtime = _FeedRuntime(
+                config=feed,
+                preprocess_queue=asyncio.Queue(maxsize=self.queue_size),
+                ocr_queue=asyncio.Queue(maxsize=self.queue_size),
+                io_slots=asyncio.Semaphore(max(1, feed.io_concurrency)),
+            )
+            self._runtimes.append(runtime)
+            self.stats[feed.name] = runtime.stats
+            self._tasks.append(asyncio.create_task(self._capture_stage(runtime), name=f"{feed.name}-capture"))
+            self._tasks.append(asyncio.create_task(self._preprocess_stage(runtime), name=f"{feed.name}-preprocess"))
+            for idx in range(max(1, feed.ocr_concurrency)):
+                self._tasks.append(asyncio.create_task(self._ocr_stage(runtime), name=f"{feed.name}-ocr{idx}"))
+
+    async def stop(self) -> None:
+        """Cancel every stage and release the executors."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._runtimes.clear()
+        if self.profiler and self.profiler.active:
+            self.profiler.stop()
+        for executor in (self._io_executor, self._ocr_executor):
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._io_executor = None
+        self._ocr_executor = None
+
+    async def results(self) -> AsyncIterator[FeedResult]:
+        """Start the pipeline if needed and yield results until cancelled or closed."""
+        await self.start()
+        try:
+            while True:
+                yield await self._results.get()
+        finally:
+            await self.stop()
+
+    async def events(self) -> AsyncIterator[FeedEvent]:
+        """Yield only text changes; use ``trackers[feed].snapshot()`` for full state on demand."""
+        async for item in self.results():
+            for event in item.events:
+                yield FeedEvent(feed=item.feed, event=event)
+
+    async def run(self) -> None:
+        """Drive the pipeline without a consumer, relying on ``publish`` for output."""
+        async for _ in self.results():
+            pass
+
+    async def __aenter__(self) -> "AsyncOCRPipeline":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def _capture_stage(self, runtime: _FeedRuntime) -> None:
+        loop = asyncio.get_running_loop()
+        feed = runtime.config
+        while True:
+            started = loop.time()
+            try:
+                frame = await self._run_io(runtime, feed.grab)
+            except Exception as exc:
+                self._record_error(runtime, exc)
+                frame = None
+            if frame is not None:
+                runtime.stats.frames += 1
+                runtime.seq += 1
+                capture_time = datetime.datetime.now().isoformat()
+                try:
+                    pts = feed.pts() if feed.pts else None
+                except Exception as exc:
+                    self._record_error(runtime, exc)
+                    pts = None
+                # blocks while downstream is busy: backpressure instead of a growing backlog
+                await runtime.preprocess_queue.put((runtime.seq, frame, capture_time, pts))
+            interval = feed.interval
+            if self.memory_guard and self.memory_guard.check() >= LEVEL_REDUCE_DECODE:
+                # over the memory ceiling: capture less often until RSS recovers
+                interval *= self.degraded_interval_factor
+            await asyncio.sleep(max(0.0, interval - (loop.time() - started)))
+
+    async def _preprocess_stage(self, runtime: _FeedRuntime) -> None:
+        feed = runtime.config
+        while True:
+            seq, frame, capture_time, pts = await runtime.preprocess_queue.get()
+            try:
+                regions = await self._run_io(runtime, self.processor.crop_regions, frame, feed.bboxes)
+            except Exception as exc:
+                self._record_error(runtime, exc)
+                continue
+            await runtime.ocr_queue.put((seq, regions, frame.size, capture_time, pts))
+
+    async def _ocr_stage(self, runtime: _FeedRuntime) -> None:
+        loop = asyncio.get_running_loop()
+        feed = runtime.config
+        while True:
+            seq, regions, image_size, capture_time, pts = await runtime.ocr_queue.get()
+            try:
+                async with self._ocr_slots:
+                    result = await loop.run_in_executor(
+                        self._ocr_executor,
+                        self.processor.run_crops,
+                        regions,
+                        feed.bboxes,
+                        image_size,
+                        feed.monitor_index,
+                        capture_time,
+                        feed.box_configs,
+                    )
+            except Exception as exc:
+                self._record_error(runtime, exc)
+                continue
+            if self.profiler:
+                try:
+                    self.profiler.tick()
+                except Exception as exc:
+                    # the dump after the last cycle writes files and runs on_done
+                    self._record_error(runtime, exc)
+            if seq <= runtime.last_applied:
+                # with ocr_concurrency > 1 an older frame can finish after a newer one
+                runtime.stats.stale += 1
+                continue
+            runtime.last_applied = seq
+            runtime.stats.results += 1
+            try:
+                events = self.trackers[feed.name].update(result, pts)
+            except Exception as exc:
+                self._record_error(runtime, exc)
+                events = []
+            if self.publish:
+                try:
+                    await self._run_io(runtime, self.publish, feed.name, result)
+                except Exception as exc:
+                    self._record_error(runtime, exc)
+            await self._results.put(FeedResult(feed=feed.name, result=result, events=events))
+
+    async def _run_io(self, runtime: _FeedRuntime, func: Callable, *args):
+        # per-feed cap on the shared io pool, like _ocr_slots/ocr_concurrency for OCR
+        async with runtime.io_slots:
+            return await asyncio.get_running_loop().run_in_executor(self._io_executor, func, *args)
+
+    @staticmethod
+    def _record_error(runtime: _FeedRuntime, exc: Exception) -> None:
+        runtime.stats.errors += 1
+        runtime.stats.last_error = str(exc)
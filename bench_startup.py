@@ -0,0 +1,105 @@
+"""Measure cold-start latency of the GUI and of the first OCR result.
+
+Each measurement runs in a fresh interpreter so module caches do not hide
+import costs::
+
+    python bench_startup.py --runs 5
+
+* ``import ocr_gui``    – importing the GUI module (should not pull in torch).
+* ``first window``      – import + ``OCRApp`` constructed + first Tk update.
+* ``first OCR result``  – import + reader load + OCR on one rendered text box.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+IMPORT_SNIPPET = """
+import json, sys, time
+started = time.perf_counter()
+import ocr_gui
+print(json.dumps({"seconds": time.perf_counter() - started, "torch_loaded": "torch" in sys.modules}))
+"""
+
+WINDOW_SNIPPET = """
+import json, time
+started = time.perf_counter()
+import tkinter as tk
+import ocr_gui
+root = tk.Tk()
+app = ocr_gui.OCRApp(root)
+root.update()
+print(json.dumps({"seconds": time.perf_counter() - started}))
+root.destroy()
+"""
+
+OCR_SNIPPET = """
+import json, time
+started = time.perf_counter()
+from PIL import Image, ImageDraw
+from ocr_pipeline import OCRProcessor
+image = Image.new("RGB", (240, 60), "white")
+ImageDraw.Draw(image).text((10, 20), "STARTUP 123", fill="black")
+processor = OCRProcessor(languages={languages!r})
+result = processor.run(image, [(0, 0, 240, 60)], monitor_index=0)
+print(json.dumps({{"seconds": time.perf_counter() - started, "text": result.boxes[0].text}}))
+"""
+
+
+def _measure(snippet: str) -> Optional[Dict]:
+    launched = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", snippet],
+        capture_output=True,
+        text=True,
+        check=False,
+        cwd=Path(__file__).resolve().parent,
+    )
+    wall = time.perf_counter() - launched
+    if proc.returncode != 0:
+        print(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed", file=sys.stderr)
+        return None
+    data = json.loads(proc.stdout.strip().splitlines()[-1])
+    data["wall"] = wall
+    return data
+
+
+def _report(label: str, samples: List[Dict]) -> None:
+    if not samples:
+        print(f"{label:<18} skipped (xem lỗi ở trên)")
+        return
+    seconds = [sample["seconds"] for sample in samples]
+    walls = [sample["wall"] for sample in samples]
+    extra = {key: value for key, value in samples[-1].items() if key not in ("seconds", "wall")}
+    print(
+        f"{label:<18} median {statistics.median(seconds):6.2f}s  "
+        f"(process wall {statistics.median(walls):6.2f}s, n={len(samples)}) {extra or ''}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--languages", nargs="+", default=["en"])
+    parser.add_argument("--skip-window", action="store_true", help="không cần màn hình (headless)")
+    parser.add_argument("--skip-ocr", action="store_true")
+    args = parser.parse_args()
+
+    cases = [("import ocr_gui", IMPORT_SNIPPET)]
+    if not args.skip_window:
+        cases.append(("first window", WINDOW_SNIPPET))
+    if not args.skip_ocr:
+        cases.append(("first OCR result", OCR_SNIPPET.format(languages=args.languages)))
+
+    for label, snippet in cases:
+        samples = [sample for sample in (_measure(snippet) for _ in range(args.runs)) if sample]
+        _report(label, samples)
+
+
+if __name__ == "__main__":
+    main()
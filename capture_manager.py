@@ -1,9 +1,12 @@
+import abc
 import datetime
 import os
+import random
 import subprocess
+import time
 from dataclasses import dataclass
 import threading
-from typing import List, Optional, Tuple
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
 import importlib.util
 
@@ -20,9 +23,17 @@ if _missing:
         f"Thiếu thư viện: {missing_list}. Hãy cài đặt bằng `{instructions}` trước khi chạy GUI."
     )
 
-import mss
+import numpy as np
 from PIL import Image
-import av
+
+if TYPE_CHECKING:
+    import av
+
+# codecs whose packets each hold a complete picture, so packets can be skipped before decoding
+INTRA_ONLY_CODECS = ("rawvideo", "mjpeg", "v210")
+
+# mss and av (PyAV/FFmpeg) are imported inside the methods that use them so the
+# GUI can open before the decoder libraries are loaded.
 
 
 def list_decklink_devices() -> List[str]:
@@ -74,6 +85,8 @@ class CaptureManager:
 
     def list_monitors(self) -> List[MonitorInfo]:
         """Return available monitors with their sizes."""
+        import mss
+
         with mss.mss() as sct:
             monitors = []
             for idx, mon in enumerate(sct.monitors[1:], start=1):
@@ -85,6 +98,8 @@ class CaptureManager:
 
         bbox format: (x1, y1, x2, y2)
         """
+        import mss
+
         with mss.mss() as sct:
             monitor = sct.monitors[self.monitor_index]
             if bbox:
@@ -110,130 +125,378 @@ class CaptureManager:
         return output_path
 
 
-class SRTStreamCapture:
-    """Receive frames from an SRT video source using PyAV to minimize drop frames."""
+class FrameBuffer:
+    """Latest-frame slot backed by a small pool of reusable NumPy buffers.
+
+    The decode thread copies each frame into a preallocated buffer instead of
+    allocating a new array and PIL image per frame. Buffers alternate so the
+    writer never touches the one being read, and the PIL image is only built
+    when a consumer asks for it (and cached until the next frame arrives).
+    """
+
+    def __init__(self, slots: int = 2) -> None:
+        self.slots = max(2, slots)
+        self.latest_pts: Optional[float] = None
+        self.frames_stored = 0
+        self._buffers: List[np.ndarray] = []
+        self._latest: Optional[int] = None
+        self._image: Optional[Image.Image] = None
+        self._image_seq = -1
+        self._lock = threading.Lock()
+
+    def store(self, array: np.ndarray, pts: Optional[float] = None) -> None:
+        """Copy ``array`` (H x W x 3 uint8) into the next free pool buffer and publish it."""
+        if not self._buffers or self._buffers[0].shape != array.shape:
+            # resolution changed (or first frame): reallocate the pool once
+            with self._lock:
+                self._buffers = [np.empty(array.shape, dtype=np.uint8) for _ in range(self.slots)]
+                self._latest = None
+                self._image = None
+        target = 0 if self._latest is None else (self._latest + 1) % self.slots
+        np.copyto(self._buffers[target], array)
+        with self._lock:
+            self._latest = target
+            self.latest_pts = pts
+            self.frames_stored += 1
+
+    def latest_image(self) -> Optional[Image.Image]:
+        with self._lock:
+            if self._latest is None:
+                return None
+            if self._image_seq != self.frames_stored or self._image is None:
+                self._image = Image.fromarray(self._buffers[self._latest])
+                self._image_seq = self.frames_stored
+            return self._image
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buffers = []
+            self._latest = None
+            self._image = None
+            self.latest_pts = None
+
+
+class CaptureState:
+    """Lifecycle states reported by supervised stream captures."""
+
+    CONNECTING = "connecting"
+    LIVE = "live"
+    STALLED = "stalled"
+    RECONNECTING = "reconnecting"
+    STOPPED = "stopped"
 
-    def __init__(self, url: str, options: Optional[dict] = None) -> None:
-        self.url = url
-        self.options = options or {"timeout": "5000000", "max_delay": "200", "reorder_queue_size": "30"}
+
+@dataclass
+class CaptureHealth:
+    """Snapshot of a stream capture's health counters."""
+
+    state: str
+    frames_decoded: int
+    packets_skipped: int
+    connects: int
+    reconnects: int
+    stalls: int
+    last_error: Optional[str]
+    last_frame_age: Optional[float]
+    live_seconds: float
+
+
+class _SupervisedStreamCapture(abc.ABC):
+    """Base class running a PyAV decode loop under a reconnect supervisor.
+
+    The worker thread opens the container, decodes frames and, when the feed
+    ends, errors or stalls, reopens it with exponential backoff while reusing
+    the same capture object. A watchdog thread watches the gap between frame
+    arrivals: after ``stall_timeout`` seconds without a frame the capture is
+    marked stalled, and after twice that the container is closed to force a
+    reconnect. Opening the source is bounded separately by ``open_timeout``
+    (passed to ``av.open``), since a hung device never hands back a container
+    the watchdog could close.
+
+    Setting ``max_fps`` lowers the decode work, not just the stored rate:
+    intra-only sources (raw DeckLink/DirectShow video, MJPEG) skip packets
+    before ``decode()``, and inter-coded streams (H.264/HEVC over SRT) ask
+    FFmpeg to skip non-reference frames (``skip_frame="NONREF"``). Reference
+    frames of inter-coded streams still have to be decoded; only frames due
+    at ``max_fps`` are converted to RGB and stored.
+    """
+
+    def __init__(
+        self,
+        auto_reconnect: bool = True,
+        stall_timeout: float = 3.0,
+        backoff_initial: float = 0.5,
+        backoff_max: float = 30.0,
+        max_reconnects: Optional[int] = None,
+        open_timeout: Optional[float] = None,
+    ) -> None:
+        self.auto_reconnect = auto_reconnect
+        self.stall_timeout = stall_timeout
+        self.open_timeout = open_timeout if open_timeout is not None else max(5.0, stall_timeout * 2)
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.max_reconnects = max_reconnects
         self.container: Optional[av.container.input.InputContainer] = None
         self.stream: Optional[av.video.stream.VideoStream] = None
-        self.latest_frame: Optional[Image.Image] = None
+        self.frame_buffer = FrameBuffer()
+        # None decodes at the source rate; MemoryGuard lowers this under memory pressure
+        self.max_fps: Optional[float] = None
+        self._skip_frame = "DEFAULT"
         self.running = False
         self.thread: Optional[threading.Thread] = None
         self.error: Optional[str] = None
+        self.state = CaptureState.STOPPED
+        self.frames_decoded = 0
+        # intra-only packets dropped before decode() under max_fps; they still prove the feed is alive
+        self.packets_skipped = 0
+        self.connects = 0
+        self.reconnects = 0
+        self.stalls = 0
+        self._watchdog: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._container_lock = threading.Lock()
+        self._last_frame_time: Optional[float] = None
+        self._opening = False
+        self._last_store_time = 0.0
+        self._session_started = 0.0
+        self._live_since: Optional[float] = None
 
     def start(self) -> None:
         if self.running:
             return
+        self.error = None
         self.running = True
-        self.thread = threading.Thread(target=self._run, daemon=True)
+        self._wake.clear()
+        self.state = CaptureState.CONNECTING
+        self.thread = threading.Thread(target=self._supervise, daemon=True)
         self.thread.start()
+        self._watchdog = threading.Thread(target=self._watch, daemon=True)
+        self._watchdog.start()
 
     def stop(self) -> None:
         self.running = False
-        if self.container:
+        self._wake.set()
+        self._close_container()
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2)
+        if self._watchdog and self._watchdog.is_alive():
+            self._watchdog.join(timeout=2)
+        self.state = CaptureState.STOPPED
+
+    def health(self) -> CaptureHealth:
+        now = time.monotonic()
+        last = self._last_frame_time
+        live_since = self._live_since
+        return CaptureHealth(
+            state=self.state,
+            frames_decoded=self.frames_decoded,
+            packets_skipped=self.packets_skipped,
+            connects=self.connects,
+            reconnects=self.reconnects,
+            stalls=self.stalls,
+            last_error=self.error,
+            last_frame_age=None if last is None else now - last,
+            live_seconds=0.0 if live_since is None else now - live_since,
+        )
+
+    @property
+    def latest_pts(self) -> Optional[float]:
+        return self.frame_buffer.latest_pts
+
+    def get_latest_frame(self) -> Optional[Image.Image]:
+        return self.frame_buffer.latest_image()
+
+    @abc.abstractmethod
+    def _open_container(self) -> "av.container.input.InputContainer":
+        """Open the source; implementations pass ``timeout=self.open_timeout`` to ``av.open``."""
+
+    def _close_container(self) -> None:
+        with self._container_lock:
+            container, self.container = self.container, None
+        if container:
             try:
-                self.container.close()
+                container.close()
             except Exception:
                 pass
-        if self.thread and self.thread.is_alive():
-            self.thread.join(timeout=2)
 
-    def _run(self) -> None:
+    def _supervise(self) -> None:
+        delay = self.backoff_initial
+        while self.running:
+            frames_before = self.frames_decoded + self.packets_skipped
+            try:
+                self._decode_session()
+                if self.running:
+                    self.error = "Stream kết thúc (EOF)"
+            except Exception as exc:
+                self.error = str(exc)
+            finally:
+                self._close_container()
+                self._live_since = None
+
+            if not self.running or not self.auto_reconnect:
+                break
+            if self.max_reconnects is not None and self.reconnects >= self.max_reconnects:
+                break
+            if self.frames_decoded + self.packets_skipped > frames_before:
+                # the last session delivered frames, so restart the backoff ladder
+                delay = self.backoff_initial
+            self.state = CaptureState.RECONNECTING
+            self.reconnects += 1
+            if self._wake.wait(delay * random.uniform(0.8, 1.2)):
+                break
+            delay = min(delay * 2, self.backoff_max)
+
+        self.running = False
+        self.state = CaptureState.STOPPED
+
+    def _decode_session(self) -> None:
+        self._session_started = time.monotonic()
+        if self.state != CaptureState.RECONNECTING:
+            self.state = CaptureState.CONNECTING
+        self._opening = True
         try:
-            self.container = av.open(self.url, options=self.options)
-            video_streams = [s for s in self.container.streams if s.type == "video"]
-            if not video_streams:
-                raise RuntimeError("Không tìm thấy video stream trong SRT")
-            self.stream = video_streams[0]
-            self.stream.thread_type = "AUTO"
-            for packet in self.container.demux(self.stream):
+            container = self._open_container()
+        finally:
+            self._opening = False
+        with self._container_lock:
+            self.container = container
+        if not self.running:
+            return
+        self.connects += 1
+        video_streams = [s for s in container.streams if s.type == "video"]
+        if not video_streams:
+            raise RuntimeError("Không tìm thấy video stream")
+        self.stream = video_streams[0]
+        self.stream.thread_type = "AUTO"
+        self._skip_frame = "DEFAULT"
+        intra_only = self.stream.codec_context.name in INTRA_ONLY_CODECS
+        for packet in container.demux(self.stream):
+            if not self.running:
+                break
+            if intra_only and self.max_fps and packet.size:
+                # the packet is a whole picture: decode only the ones that will be stored
+                if not self._store_due():
+                    self.packets_skipped += 1
+                    self._on_arrival()
+                    continue
+                for frame in packet.decode():
+                    self._on_frame()
+                    self._store_frame(frame)
+                continue
+            self._apply_skip_frame()
+            for frame in packet.decode():
                 if not self.running:
                     break
-                for frame in packet.decode():
-                    if not self.running:
-                        break
-                    img = frame.to_ndarray(format="rgb24")
-                    self.latest_frame = Image.fromarray(img)
-        except Exception as exc:
-            self.error = str(exc)
-        finally:
-            if self.container:
-                try:
-                    self.container.close()
-                except Exception:
-                    pass
-            self.running = False
+                self._on_frame()
+                if self._store_due():
+                    self._store_frame(frame)
+
+    def _store_due(self) -> bool:
+        if not self.max_fps:
+            return True
+        now = time.monotonic()
+        if now - self._last_store_time < 1.0 / self.max_fps:
+            return False
+        self._last_store_time = now
+        return True
+
+    def _apply_skip_frame(self) -> None:
+        wanted = "NONREF" if self.max_fps else "DEFAULT"
+        if wanted == self._skip_frame:
+            return
+        self._skip_frame = wanted
+        try:
+            self.stream.codec_context.skip_frame = wanted
+        except (AttributeError, TypeError, ValueError):
+            # older PyAV without skip_frame: fall back to storing fewer frames only
+            pass
+
+    def _store_frame(self, frame: "av.VideoFrame") -> None:
+        # reformat() allocates a new rgb24 frame each call (PyAV has no reusable destination);
+        # with max_fps set this only happens for frames that are actually stored
+        rgb = frame if frame.format.name == "rgb24" else frame.reformat(format="rgb24")
+        plane = rgb.planes[0]
+        # rows may be padded to line_size; view them without copying, then copy once into the pool
+        rows = np.frombuffer(plane, dtype=np.uint8).reshape(rgb.height, plane.line_size)
+        self.frame_buffer.store(rows[:, : rgb.width * 3].reshape(rgb.height, rgb.width, 3), frame.time)
+
+    def _on_frame(self) -> None:
+        self.frames_decoded += 1
+        self._on_arrival()
+
+    def _on_arrival(self) -> None:
+        # stall detection tracks pictures arriving, decoded or not
+        now = time.monotonic()
+        self._last_frame_time = now
+        if self.state != CaptureState.LIVE:
+            self.state = CaptureState.LIVE
+            self._live_since = now
+            self.error = None
+
+    def _watch(self) -> None:
+        interval = max(0.1, min(0.5, self.stall_timeout / 4))
+        while self.running:
+            if self._wake.wait(interval):
+                return
+            last = self._last_frame_time
+            reference = self._session_started if last is None else max(last, self._session_started)
+            gap = time.monotonic() - reference
+            if self.container is None:
+                # nothing to close yet; av.open gives up after open_timeout and the supervisor retries.
+                # keep a real error from the previous attempt visible instead of this progress note
+                progress_only = self.error is None or self.error.startswith("Đang mở")
+                if self._opening and gap > self.stall_timeout * 2 and progress_only:
+                    self.error = f"Đang mở nguồn {gap:.1f}s (timeout {self.open_timeout:.0f}s)"
+                continue
+            if self.state == CaptureState.LIVE and gap > self.stall_timeout:
+                self.state = CaptureState.STALLED
+                self.stalls += 1
+            elif gap > self.stall_timeout * 2 and self.state in (CaptureState.STALLED, CaptureState.CONNECTING, CaptureState.RECONNECTING):
+                self.error = f"Không nhận frame trong {gap:.1f}s, đang kết nối lại"
+                # closing the container unblocks demux() so the supervisor can reconnect
+                self._close_container()
+
+
+class SRTStreamCapture(_SupervisedStreamCapture):
+    """Receive frames from an SRT video source using PyAV to minimize drop frames.
+
+    Dropped feeds are reconnected automatically; see ``health()`` for counters.
+    """
+
+    def __init__(self, url: str, options: Optional[dict] = None, **supervisor_options) -> None:
+        super().__init__(**supervisor_options)
+        self.url = url
+        self.options = options or {"timeout": "5000000", "max_delay": "200", "reorder_queue_size": "30"}
 
-    def get_latest_frame(self) -> Optional[Image.Image]:
-        return self.latest_frame
+    def _open_container(self) -> "av.container.input.InputContainer":
+        import av
 
+        return av.open(self.url, options=self.options, timeout=self.open_timeout)
 
-class DirectShowCapture:
+
+class DirectShowCapture(_SupervisedStreamCapture):
     """Capture frames from DirectShow (e.g., DeckLink WDM devices) via FFmpeg/PyAV."""
 
-    def __init__(self, device: str, video_size: str = "1920x1080", fps: str = "60") -> None:
+    def __init__(
+        self, device: str, video_size: str = "1920x1080", fps: str = "60", **supervisor_options
+    ) -> None:
+        super().__init__(**supervisor_options)
         self.device = device
         self.video_size = video_size
         self.fps = fps
-        self.container: Optional[av.container.input.InputContainer] = None
-        self.stream: Optional[av.video.stream.VideoStream] = None
-        self.latest_frame: Optional[Image.Image] = None
-        self.running = False
-        self.thread: Optional[threading.Thread] = None
-        self.error: Optional[str] = None
 
     def start(self) -> None:
-        if self.running:
+        if os.name != "nt":
+            self.error = "DirectShow chỉ khả dụng trên Windows."
             return
-        self.error = None
-        self.running = True
-        self.thread = threading.Thread(target=self._run, daemon=True)
-        self.thread.start()
+        super().start()
 
-    def stop(self) -> None:
-        self.running = False
-        if self.container:
-            try:
-                self.container.close()
-            except Exception:
-                pass
-        if self.thread and self.thread.is_alive():
-            self.thread.join(timeout=2)
-
-    def _run(self) -> None:
-        try:
-            if os.name != "nt":
-                raise RuntimeError("DirectShow chỉ khả dụng trên Windows.")
-
-            self.container = av.open(
-                f"video={self.device}",
-                format="dshow",
-                options={"video_size": self.video_size, "framerate": self.fps},
-            )
-            video_streams = [s for s in self.container.streams if s.type == "video"]
-            if not video_streams:
-                raise RuntimeError("Không tìm thấy video stream từ DirectShow")
-            self.stream = video_streams[0]
-            self.stream.thread_type = "AUTO"
-            for packet in self.container.demux(self.stream):
-                if not self.running:
-                    break
-                for frame in packet.decode():
-                    if not self.running:
-                        break
-                    img = frame.to_ndarray(format="rgb24")
-                    self.latest_frame = Image.fromarray(img)
-        except Exception as exc:
-            self.error = str(exc)
-        finally:
-            if self.container:
-                try:
-                    self.container.close()
-                except Exception:
-                    pass
-            self.running = False
+    def _open_container(self) -> "av.container.input.InputContainer":
+        import av
 
-    def get_latest_frame(self) -> Optional[Image.Image]:
-        return self.latest_frame
+        return av.open(
+            f"video={self.device}",
+            format="dshow",
+            options={"video_size": self.video_size, "framerate": self.fps},
+            timeout=self.open_timeout,
+        )
@@ -0,0 +1,710 @@
+"""Split deployment: capture nodes ship ROI crops to a pool of OCR workers.
+
+A capture node grabs frames (``CaptureManager`` / ``SRTStreamCapture`` /
+``DirectShowCapture``), crops each bounding box and sends only the cropped
+arrays plus metadata to OCR worker processes over
+``multiprocessing.connection`` sockets. Workers run ``OCRProcessor.read_region``
+and reply per box; ``ResultAssembler`` puts the boxes of a frame back together
+into one ``OCRSessionResult`` per source.
+
+Nothing on the wire is pickled: a task is a small JSON header (ids, box config,
+dtype and shape) followed by the raw ROI bytes, and a result is plain JSON.
+Connections are authenticated with an HMAC challenge using the shared key from
+``OCR_SRT_AUTHKEY`` or ``--authkey``; there is no built-in default key, and a
+worker refuses to listen on a non-loopback address without one.
+
+Each ROI is dispatched to the worker with the fewest in-flight tasks, capped at
+``max_inflight`` per worker, so a busy worker applies backpressure on the
+capture loop. Tasks in flight on a worker that disconnects are re-sent to the
+remaining workers, and the link is re-established in the background once the
+worker is back.
+
+On one Linux machine (a random key is generated for the spawned workers)::
+
+    python distributed_ocr.py local --workers 3 --srt srt://127.0.0.1:9000 --box 0,0,400,80
+
+Across hosts::
+
+    export OCR_SRT_AUTHKEY=<same secret on every node>
+    python distributed_ocr.py worker --host 0.0.0.0 --port 6100 --languages en
+    python distributed_ocr.py capture --workers ocr1:6100,ocr2:6100 --srt srt://cam:9000 --box 0,0,400,80
+"""
+
+import argparse
+import datetime
+import ipaddress
+import json
+import multiprocessing
+import os
+import random
+import secrets
+import struct
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from ocr_pipeline import BoxConfig, OCRBoxResult, OCRProcessor, OCRSessionResult, crop_region
+
+Address = Tuple[str, int]
+ResultCallback = Callable[[str, OCRSessionResult], None]
+ErrorCallback = Callable[[str, str, str], None]
+
+AUTHKEY_ENV = "OCR_SRT_AUTHKEY"
+DEFAULT_PORT = 6100
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+_ROI_DTYPES = ("uint8",)
+_HEADER = struct.Struct("<I")
+
+
+def parse_address(text: str, default_port: int = DEFAULT_PORT) -> Address:
+    host, _, port = text.strip().rpartition(":")
+    if not host:
+        return text.strip(), default_port
+    return host, int(port)
+
+
+def resolve_authkey(value: Optional[str] = None) -> Optional[bytes]:
+    """Shared key from ``value`` (``--authkey``) or ``OCR_SRT_AUTHKEY``; ``None`` if neither is set."""
+    key = value or os.environ.get(AUTHKEY_ENV)
+    return key.encode("utf-8") if key else None
+
+
+def is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+@dataclass
+class RoiTask:
+    source: str
+    seq: int
+    box_index: int
+    region: np.ndarray
+    config: Optional[BoxConfig] = None
+
+    @property
+    def key(self) -> Tuple[str, int, int]:
+        return self.source, self.seq, self.box_index
+
+    def to_bytes(self) -> bytes:
+        region = np.ascontiguousarray(self.region)
+        header = json.dumps(
+            {
+                "source": self.source,
+                "seq": self.seq,
+                "box_index": self.box_index,
+                "dtype": region.dtype.name,
+                "shape": list(region.shape),
+                "config": self.config.to_dict() if self.config else None,
+            },
+            ensure_ascii=False,
+        ).encode("utf-8")
+        return _HEADER.pack(len(header)) + header + region.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "RoiTask":
+        (header_size,) = _HEADER.unpack_from(data)
+        header = json.loads(data[_HEADER.size:_HEADER.size + header_size].decode("utf-8"))
+        if header["dtype"] not in _ROI_DTYPES:
+            raise ValueError(f"Kiểu dữ liệu ROI không hỗ trợ: {header['dtype']}")
+        region = np.frombuffer(data, dtype=header["dtype"], offset=_HEADER.size + header_size)
+        config = header.get("config")
+        return cls(
+            source=str(header["source"]),
+            seq=int(header["seq"]),
+            box_index=int(header["box_index"]),
+            # copy: frombuffer gives a read-only view of the message
+            region=region.reshape([int(dim) for dim in header["shape"]]).copy(),
+            config=BoxConfig.from_dict(config) if config else None,
+        )
+
+
+@dataclass
+class RoiResult:
+    source: str
+    seq: int
+    box_index: int
+    text: str
+    confidence: float
+    error: Optional[str] = None
+
+    @property
+    def key(self) -> Tuple[str, int, int]:
+        return self.source, self.seq, self.box_index
+
+    def to_bytes(self) -> bytes:
+        return json.dumps(self.__dict__, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "RoiResult":
+        fields = json.loads(data.decode("utf-8"))
+        return cls(
+            source=str(fields["source"]),
+            seq=int(fields["seq"]),
+            box_index=int(fields["box_index"]),
+            text=str(fields["text"]),
+            confidence=float(fields["confidence"]),
+            error=fields.get("error"),
+        )
+
+
+# --------------------------------------------------------------------------- worker
+
+
+def run_worker(
+    address: Address,
+    languages: List[str],
+    gpu: bool = False,
+    authkey: Optional[bytes] = None,
+) -> None:
+    """Serve OCR requests forever; one thread per connected capture node."""
+    if not authkey and not is_loopback(address[0]):
+        raise ValueError(f"Cần authkey ({AUTHKEY_ENV} hoặc --authkey) để lắng nghe trên {address[0]}")
+    processor = OCRProcessor(languages=languages, gpu=gpu)
+    ocr_lock = threading.Lock()
+    with Listener(address, authkey=authkey) as listener:
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception:
+                # failed handshake (wrong authkey, port scan): keep serving
+                continue
+            threading.Thread(target=_serve_connection, args=(conn, processor, ocr_lock), daemon=True).start()
+
+
+def _serve_connection(conn: Connection, processor: OCRProcessor, ocr_lock: threading.Lock) -> None:
+    with conn:
+        while True:
+            try:
+                data = conn.recv_bytes(MAX_MESSAGE_BYTES)
+            except (EOFError, OSError):
+                return
+            if not data:
+                return
+            try:
+                task = RoiTask.from_bytes(data)
+            except (ValueError, KeyError, TypeError, struct.error):
+                # malformed message: the peer does not speak this protocol
+                return
+            try:
+                with ocr_lock:
+                    text, confidence = processor.read_region(task.region, task.config)
+                result = RoiResult(task.source, task.seq, task.box_index, text, confidence)
+            except Exception as exc:
+                result = RoiResult(task.source, task.seq, task.box_index, "", 0.0, error=str(exc))
+            try:
+                conn.send_bytes(result.to_bytes())
+            except OSError:
+                return
+
+
+def spawn_local_workers(
+    count: int,
+    languages: List[str],
+    base_port: int = DEFAULT_PORT,
+    gpu: bool = False,
+    authkey: Optional[bytes] = None,
+) -> Tuple[List[multiprocessing.Process], List[Address]]:
+    """Start ``count`` worker processes on localhost (ports ``base_port``…)."""
+    ctx = multiprocessing.get_context("spawn")
+    processes = []
+    addresses = []
+    for idx in range(count):
+        address = ("127.0.0.1", base_port + idx)
+        process = ctx.Process(
+            target=run_worker,
+            args=(address, languages, gpu, authkey),
+            name=f"ocr-worker-{idx}",
+            daemon=True,
+        )
+        process.start()
+        processes.append(process)
+        addresses.append(address)
+    return processes, addresses
+
+
+# --------------------------------------------------------------------------- capture side
+
+
+@dataclass
+class _WorkerLink:
+    address: Address
+    conn: Optional[Connection] = None
+    inflight: Dict[Tuple[str, int, int], RoiTask] = field(default_factory=dict)
+    alive: bool = False
+    connects: int = 0
+    completed: int = 0
+    send_lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class WorkerPool:
+    """Connections to OCR workers with least-loaded dispatch and failover.
+
+    Every worker link is kept up by its own thread: it connects, receives
+    results until the connection drops, then reconnects with jittered
+    exponential backoff, so workers may start late or restart at any time.
+    The constructor only waits (up to ``connect_timeout``) for the first worker.
+    """
+
+    def __init__(
+        self,
+        addresses: List[Address],
+        on_result: Callable[[RoiResult, str], None],
+        max_inflight: int = 4,
+        authkey: Optional[bytes] = None,
+        connect_timeout: float = 120.0,
+        backoff_initial: float = 0.5,
+        backoff_max: float = 30.0,
+    ) -> None:
+        if not addresses:
+            raise ValueError("Cần ít nhất một địa chỉ OCR worker")
+        self.on_result = on_result
+        self.max_inflight = max(1, max_inflight)
+        self.authkey = authkey
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.lost_tasks = 0
+        self.callback_errors = 0
+        self.last_callback_error: Optional[str] = None
+        self._cond = threading.Condition()
+        self._closed = threading.Event()
+        self._links = [_WorkerLink(address) for address in addresses]
+        for link in self._links:
+            threading.Thread(
+                target=self._maintain, args=(link,), name=f"ocr-link-{_format_address(link.address)}", daemon=True
+            ).start()
+        if not self.wait_ready(connect_timeout):
+            self.close()
+            raise RuntimeError(f"Không kết nối được OCR worker nào sau {connect_timeout:.0f}s")
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until at least one worker is connected."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._closed.is_set() or bool(self._alive_links()), timeout) and bool(
+                self._alive_links()
+            )
+
+    def submit(self, task: RoiTask, timeout: Optional[float] = None) -> bool:
+        """Send ``task`` to the least-loaded worker.
+
+        Blocks while every connected worker is full or none is connected;
+        returns ``False`` on timeout or after ``close()``.
+        """
+        with self._cond:
+            ready = self._cond.wait_for(
+                lambda: self._closed.is_set()
+                or any(len(link.inflight) < self.max_inflight for link in self._alive_links()),
+                timeout,
+            )
+            if not ready or self._closed.is_set():
+                return False
+            link = min(self._alive_links(), key=lambda candidate: len(candidate.inflight))
+            link.inflight[task.key] = task
+            conn = link.conn
+        try:
+            with link.send_lock:
+                conn.send_bytes(task.to_bytes())
+        except OSError:
+            self._fail(link)
+        return True
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._cond:
+            return {
+                _format_address(link.address): {
+                    "alive": int(link.alive),
+                    "inflight": len(link.inflight),
+                    "completed": link.completed,
+                    "reconnects": max(0, link.connects - 1),
+                }
+                for link in self._links
+            }
+
+    def close(self) -> None:
+        self._closed.set()
+        with self._cond:
+            links = [link for link in self._links if link.conn is not None]
+            self._cond.notify_all()
+        for link in links:
+            try:
+                with link.send_lock:
+                    link.conn.send_bytes(b"")
+            except OSError:
+                pass
+            link.conn.close()
+
+    def _alive_links(self) -> List[_WorkerLink]:
+        return [link for link in self._links if link.alive]
+
+    def _maintain(self, link: _WorkerLink) -> None:
+        delay = self.backoff_initial
+        while not self._closed.is_set():
+            try:
+                conn = Client(link.address, authkey=self.authkey)
+            except (OSError, EOFError, multiprocessing.AuthenticationError):
+                # worker not up yet (still loading models) or restarting
+                if self._closed.wait(delay * random.uniform(0.8, 1.2)):
+                    return
+                delay = min(delay * 2, self.backoff_max)
+                continue
+            delay = self.backoff_initial
+            with self._cond:
+                if self._closed.is_set():
+                    conn.close()
+                    return
+                link.conn = conn
+                link.alive = True
+                link.connects += 1
+                self._cond.notify_all()
+            try:
+                self._receive(link, conn)
+            except Exception as exc:
+                # a bug on this side must not end the link thread; reconnect like after a drop
+                self._record_callback_error(exc)
+            finally:
+                self._fail(link)
+                conn.close()
+
+    def _receive(self, link: _WorkerLink, conn: Connection) -> None:
+        while True:
+            try:
+                result = RoiResult.from_bytes(conn.recv_bytes(MAX_MESSAGE_BYTES))
+            except (EOFError, OSError, ValueError, KeyError, TypeError):
+                return
+            with self._cond:
+                link.inflight.pop(result.key, None)
+                link.completed += 1
+                self._cond.notify_all()
+            try:
+                self.on_result(result, _format_address(link.address))
+            except Exception as exc:
+                # e.g. the result writer hit an OSError; keep draining this worker
+                self._record_callback_error(exc)
+
+    def _record_callback_error(self, exc: Exception) -> None:
+        with self._cond:
+            self.callback_errors += 1
+            self.last_callback_error = f"{type(exc).__name__}: {exc}"
+
+    def _fail(self, link: _WorkerLink) -> None:
+        with self._cond:
+            if not link.alive:
+                return
+            link.alive = False
+            orphans = list(link.inflight.values())
+            link.inflight.clear()
+            self._cond.notify_all()
+        for task in orphans:
+            # never block here: this may run on the link thread that has to reconnect
+            if not self.submit(task, timeout=0):
+                with self._cond:
+                    self.lost_tasks += 1
+
+
+def _format_address(address: Address) -> str:
+    return f"{address[0]}:{address[1]}"
+
+
+@dataclass
+class _PendingFrame:
+    bboxes: List[Tuple[int, int, int, int]]
+    image_size: Tuple[int, int]
+    monitor_index: int
+    capture_time: str
+    boxes: List[Optional[OCRBoxResult]]
+    remaining: int
+
+
+class ResultAssembler:
+    """Collect per-box results and emit one ``OCRSessionResult`` per complete frame.
+
+    Frames older than the last emitted one for the same source are discarded,
+    and at most ``max_pending_frames`` incomplete frames are kept per source.
+    A box that failed on its worker drops the whole frame rather than emitting
+    an empty text that looks like "no text"; failures are counted per
+    ``(source, worker)`` in ``box_errors`` and passed to ``on_error``.
+    """
+
+    def __init__(
+        self, on_result: ResultCallback, max_pending_frames: int = 8, on_error: Optional[ErrorCallback] = None
+    ) -> None:
+        self.on_result = on_result
+        self.on_error = on_error
+        self.max_pending_frames = max_pending_frames
+        self.dropped_frames = 0
+        self.failed_frames = 0
+        self.box_errors: Counter = Counter()
+        self._pending: "OrderedDict[Tuple[str, int], _PendingFrame]" = OrderedDict()
+        self._last_emitted: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def expect(
+        self,
+        source: str,
+        seq: int,
+        bboxes: List[Tuple[int, int, int, int]],
+        image_size: Tuple[int, int],
+        monitor_index: int,
+        capture_time: str,
+    ) -> None:
+        with self._lock:
+            self._pending[(source, seq)] = _PendingFrame(
+                bboxes=list(bboxes),
+                image_size=image_size,
+                monitor_index=monitor_index,
+                capture_time=capture_time,
+                boxes=[None] * len(bboxes),
+                remaining=len(bboxes),
+            )
+            same_source = [key for key in self._pending if key[0] == source]
+            for key in same_source[: max(0, len(same_source) - self.max_pending_frames)]:
+                del self._pending[key]
+                self.dropped_frames += 1
+
+    def discard(self, source: str, seq: int) -> None:
+        with self._lock:
+            if self._pending.pop((source, seq), None) is not None:
+                self.dropped_frames += 1
+
+    def add(self, roi: RoiResult, worker: str = "") -> None:
+        if roi.error is not None:
+            self._fail(roi, worker)
+            return
+        with self._lock:
+            frame = self._pending.get((roi.source, roi.seq))
+            if frame is None or not 0 <= roi.box_index < len(frame.boxes):
+                return
+            if frame.boxes[roi.box_index] is not None:
+                return
+            frame.boxes[roi.box_index] = OCRBoxResult(
+                bbox=frame.bboxes[roi.box_index], text=roi.text, confidence=roi.confidence
+            )
+            frame.remaining -= 1
+            if frame.remaining:
+                return
+            del self._pending[(roi.source, roi.seq)]
+            if roi.seq < self._last_emitted.get(roi.source, -1):
+                self.dropped_frames += 1
+                return
+            self._last_emitted[roi.source] = roi.seq
+            result = OCRSessionResult(
+                capture_time=frame.capture_time,
+                monitor_index=frame.monitor_index,
+                image_size=frame.image_size,
+                boxes=frame.boxes,
+            )
+        self.on_result(roi.source, result)
+
+    def _fail(self, roi: RoiResult, worker: str) -> None:
+        with self._lock:
+            self.box_errors[(roi.source, worker)] += 1
+            if self._pending.pop((roi.source, roi.seq), None) is not None:
+                self.failed_frames += 1
+        if self.on_error:
+            self.on_error(roi.source, worker, roi.error)
+
+
+@dataclass
+class CaptureSource:
+    """A frame source on the capture node; ``grab`` returns the newest frame or ``None``."""
+
+    name: str
+    grab: Callable[[], Optional[Image.Image]]
+    bboxes: List[Tuple[int, int, int, int]]
+    box_configs: Optional[List[Optional[BoxConfig]]] = None
+    monitor_index: int = 0
+    interval: float = 1.0
+
+
+class CaptureNode:
+    """Grab, crop and dispatch ROIs for every source; results arrive via ``on_result``."""
+
+    def __init__(
+        self,
+        sources: List[CaptureSource],
+        worker_addresses: List[Address],
+        on_result: ResultCallback,
+        max_inflight: int = 4,
+        authkey: Optional[bytes] = None,
+        connect_timeout: float = 120.0,
+    ) -> None:
+        self.sources = sources
+        self.assembler = ResultAssembler(on_result, on_error=self._record_ocr_error)
+        self.pool = WorkerPool(
+            worker_addresses,
+            self.assembler.add,
+            max_inflight=max_inflight,
+            authkey=authkey,
+            connect_timeout=connect_timeout,
+        )
+        self.errors: Dict[str, str] = {}
+        self.running = False
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self.running = True
+        for source in self.sources:
+            thread = threading.Thread(target=self._run_source, args=(source,), name=f"capture-{source.name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        self.running = False
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._threads.clear()
+        self.pool.close()
+
+    def _record_ocr_error(self, source: str, worker: str, error: str) -> None:
+        self.errors[source] = f"OCR {worker}: {error}"
+
+    def _run_source(self, source: CaptureSource) -> None:
+        seq = 0
+        configs = source.box_configs or [None] * len(source.bboxes)
+        while self.running:
+            started = time.monotonic()
+            try:
+                frame = source.grab()
+                if frame is not None:
+                    seq += 1
+                    capture_time = datetime.datetime.now().isoformat()
+                    regions = [crop_region(frame, bbox) for bbox in source.bboxes]
+                    self.assembler.expect(
+                        source.name, seq, source.bboxes, frame.size, source.monitor_index, capture_time
+                    )
+                    for box_index, (region, config) in enumerate(zip(regions, configs)):
+                        task = RoiTask(source.name, seq, box_index, region, config)
+                        if not self.pool.submit(task, timeout=max(1.0, source.interval)):
+                            # no worker free (or none connected): skip this frame, keep capturing
+                            self.assembler.discard(source.name, seq)
+                            break
+            except Exception as exc:
+                self.errors[source.name] = str(exc)
+            time.sleep(max(0.0, source.interval - (time.monotonic() - started)))
+
+
+# --------------------------------------------------------------------------- CLI
+
+
+def _parse_box(text: str) -> Tuple[int, int, int, int]:
+    x1, y1, x2, y2 = (int(value) for value in text.split(","))
+    return x1, y1, x2, y2
+
+
+def _build_sources(args: argparse.Namespace) -> List[CaptureSource]:
+    from capture_manager import CaptureManager, SRTStreamCapture
+
+    boxes = [_parse_box(box) for box in args.box]
+    sources = []
+    for idx, url in enumerate(args.srt or []):
+        capture = SRTStreamCapture(url)
+        capture.start()
+        sources.append(CaptureSource(f"srt{idx + 1}", capture.get_latest_frame, boxes, interval=args.interval))
+    for monitor_index in args.monitor or []:
+        manager = CaptureManager(monitor_index=monitor_index)
+        sources.append(
+            CaptureSource(
+                f"monitor{monitor_index}", manager.grab_frame, boxes, monitor_index=monitor_index, interval=args.interval
+            )
+        )
+    return sources
+
+
+def _run_capture(args: argparse.Namespace, addresses: List[Address], authkey: bytes) -> None:
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    def write_latest(source: str, result: OCRSessionResult) -> None:
+        (output_dir / f"{source}_latest.json").write_text(result.to_json(), encoding="utf-8")
+
+    sources = _build_sources(args)
+    if not sources:
+        raise SystemExit("Cần ít nhất một nguồn: --srt URL hoặc --monitor N")
+    node = CaptureNode(sources, addresses, write_latest, max_inflight=args.max_inflight, authkey=authkey)
+    node.start()
+    try:
+        while True:
+            time.sleep(5)
+            print(
+                f"workers={node.pool.stats()} dropped={node.assembler.dropped_frames} "
+                f"failed={node.assembler.failed_frames} lost={node.pool.lost_tasks} errors={node.errors} "
+                f"callback_errors={node.pool.callback_errors} ({node.pool.last_callback_error})",
+                flush=True,
+            )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        node.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    worker = commands.add_parser("worker", help="chạy một OCR worker")
+    worker.add_argument("--host", default="127.0.0.1")
+    worker.add_argument("--port", type=int, default=DEFAULT_PORT)
+
+    capture = commands.add_parser("capture", help="chạy capture node, gửi ROI tới worker có sẵn")
+    capture.add_argument("--workers", required=True, help="host:port,host:port,...")
+
+    local = commands.add_parser("local", help="tự chạy N worker trên máy này và một capture node")
+    local.add_argument("--workers", type=int, default=2)
+    local.add_argument("--base-port", type=int, default=DEFAULT_PORT)
+
+    for sub in (worker, capture):
+        sub.add_argument("--authkey", help=f"khóa chung giữa các node (mặc định lấy từ {AUTHKEY_ENV})")
+    for sub in (worker, local):
+        sub.add_argument("--languages", nargs="+", default=["en"])
+        sub.add_argument("--gpu", action="store_true")
+    for sub in (capture, local):
+        sub.add_argument("--srt", action="append", help="URL SRT (lặp lại cho nhiều feed)")
+        sub.add_argument("--monitor", type=int, action="append", help="monitor index (lặp lại được)")
+        sub.add_argument("--box", action="append", required=True, help="x1,y1,x2,y2 (lặp lại cho nhiều box)")
+        sub.add_argument("--interval", type=float, default=1.0)
+        sub.add_argument("--max-inflight", type=int, default=4)
+        sub.add_argument("--output-dir", default=str(Path("outputs") / "distributed"))
+
+    args = parser.parse_args()
+    if args.command == "local":
+        # workers are spawned here, so a one-off key never has to leave this process
+        authkey = resolve_authkey() or secrets.token_hex(32).encode("ascii")
+    else:
+        authkey = resolve_authkey(args.authkey)
+        if not authkey:
+            parser.error(f"cần khóa chung: đặt biến môi trường {AUTHKEY_ENV} hoặc dùng --authkey")
+    if args.command == "worker":
+        run_worker((args.host, args.port), args.languages, gpu=args.gpu, authkey=authkey)
+    elif args.command == "capture":
+        addresses = [parse_address(address) for address in args.workers.split(",") if address.strip()]
+        _run_capture(args, addresses, authkey)
+    else:
+        processes, addresses = spawn_local_workers(
+            args.workers,
+            args.languages,
+            args.base_port,
+            gpu=args.gpu,
+            authkey=authkey,
+        )
+        try:
+            _run_capture(args, addresses, authkey)
+        finally:
+            for process in processes:
+                process.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Memory ceiling, graceful degradation and periodic memory reports for long runs.
+
+``MemoryGuard.check()`` is cheap to call from any loop: it samples RSS at most
+every ``check_interval`` seconds and maps it to a degradation level.
+
+* ``LEVEL_NORMAL``         – below ``soft_ratio * ceiling``.
+* ``LEVEL_DROP_PREVIEW``   – above the soft limit: stop rendering previews.
+* ``LEVEL_REDUCE_DECODE``  – above the ceiling: also lower the capture rate
+  (``max_fps`` on stream captures, which skips decoding where the codec allows).
+
+A level is only left once RSS falls 10% below the threshold that raised it,
+so callers do not flap around the limit. When ``report_path`` is set, a JSON
+line with RSS (and tracemalloc totals/top allocations when ``trace=True``) is
+appended every ``report_interval`` seconds.
+"""
+
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, List, Optional, Union
+
+LEVEL_NORMAL = 0
+LEVEL_DROP_PREVIEW = 1
+LEVEL_REDUCE_DECODE = 2
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process, or ``None`` if it cannot be read."""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm", "r") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is the peak, not the current value, but is the best fallback available
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass
+class MemoryReport:
+    timestamp: str
+    rss_mb: Optional[float]
+    peak_rss_mb: Optional[float]
+    level: int
+    traced_mb: Optional[float] = None
+    top_allocations: List[str] = field(default_factory=list)
+
+    def to_json(self) -> str:
+        return json.dumps(self.__dict__, ensure_ascii=False, separators=(",", ":"))
+
+
+class MemoryGuard:
+    """Track RSS against a ceiling and report degradation levels."""
+
+    def __init__(
+        self,
+        ceiling_mb: Optional[float] = None,
+        soft_ratio: float = 0.85,
+        check_interval: float = 2.0,
+        report_interval: float = 60.0,
+        report_path: Optional[Union[str, Path]] = None,
+        trace: bool = False,
+        top_n: int = 5,
+        on_level_change: Optional[Callable[[int], None]] = None,
+    ) -> None:
+        self.ceiling_mb = ceiling_mb
+        self.soft_ratio = soft_ratio
+        self.check_interval = check_interval
+        self.report_interval = report_interval
+        self.report_path = Path(report_path) if report_path else None
+        self.trace = trace
+        self.top_n = top_n
+        self.on_level_change = on_level_change
+        self.level = LEVEL_NORMAL
+        self.rss_mb: Optional[float] = None
+        self.peak_rss_mb: Optional[float] = None
+        self._last_check = 0.0
+        self._last_report = time.monotonic()
+        self._lock = threading.Lock()
+        if trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def check(self, force: bool = False) -> int:
+        """Sample memory if due and return the current degradation level."""
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_check < self.check_interval:
+                return self.level
+            self._last_check = now
+            rss = current_rss_bytes()
+            if rss is not None:
+                self.rss_mb = rss / (1024 * 1024)
+                self.peak_rss_mb = max(self.peak_rss_mb or 0.0, self.rss_mb)
+            previous = self.level
+            self.level = self._level_for(self.rss_mb, previous)
+            report_due = self.report_path is not None and now - self._last_report >= self.report_interval
+            if report_due:
+                self._last_report = now
+
+        if self.level != previous and self.on_level_change:
+            self.on_level_change(self.level)
+        if report_due:
+            self.write_report()
+        return self.level
+
+    def _level_for(self, rss_mb: Optional[float], previous: int) -> int:
+        if self.ceiling_mb is None or rss_mb is None:
+            return LEVEL_NORMAL
+        soft_limit = self.ceiling_mb * self.soft_ratio
+        if rss_mb >= self.ceiling_mb:
+            return LEVEL_REDUCE_DECODE
+        if previous == LEVEL_REDUCE_DECODE and rss_mb >= self.ceiling_mb * 0.9:
+            return LEVEL_REDUCE_DECODE
+        if rss_mb >= soft_limit:
+            return LEVEL_DROP_PREVIEW
+        if previous != LEVEL_NORMAL and rss_mb >= soft_limit * 0.9:
+            return LEVEL_DROP_PREVIEW
+        return LEVEL_NORMAL
+
+    def report(self) -> MemoryReport:
+        traced_mb = None
+        top: List[str] = []
+        if self.trace and tracemalloc.is_tracing():
+            traced_mb = tracemalloc.get_traced_memory()[0] / (1024 * 1024)
+            stats = tracemalloc.take_snapshot().statistics("lineno")
+            top = [str(stat) for stat in stats[: self.top_n]]
+        return MemoryReport(
+            timestamp=datetime.datetime.now().isoformat(),
+            rss_mb=self.rss_mb,
+            peak_rss_mb=self.peak_rss_mb,
+            level=self.level,
+            traced_mb=traced_mb,
+            top_allocations=top,
+        )
+
+    def write_report(self) -> MemoryReport:
+        report = self.report()
+        if self.report_path is not None:
+            self.report_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.report_path, "a", encoding="utf-8") as handle:
+                handle.write(report.to_json() + "\n")
+        return report
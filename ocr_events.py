@@ -0,0 +1,185 @@
+"""Region-level text change events derived from successive OCR results.
+
+``ChangeTracker.update`` compares a new ``OCRSessionResult`` with the last
+known text of every box and returns only the boxes whose text changed, so
+consumers work in O(changes) instead of diffing full snapshots. Subscribers
+registered with ``subscribe`` receive each batch as it is produced; an
+exception in one subscriber is counted in ``subscriber_errors`` and does not
+reach the other subscribers or the caller. A full snapshot is rebuilt from the
+tracked state only when ``snapshot`` is called.
+"""
+
+import json
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from ocr_pipeline import OCRBoxResult, OCRSessionResult
+
+EventCallback = Callable[[List["TextChangeEvent"]], None]
+
+
+@dataclass(slots=True)
+class TextChangeEvent:
+    box_id: int
+    old_text: str
+    new_text: str
+    confidence: float
+    pts: Optional[float]
+    capture_time: str
+    bbox: Tuple[int, int, int, int]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "box_id": self.box_id,
+            "old_text": self.old_text,
+            "new_text": self.new_text,
+            "confidence": self.confidence,
+            "pts": self.pts,
+            "capture_time": self.capture_time,
+            "bbox": self.bbox,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TextChangeEvent":
+        return cls(
+            box_id=int(data["box_id"]),
+            old_text=data["old_text"],
+            new_text=data["new_text"],
+            confidence=float(data["confidence"]),
+            pts=data.get("pts"),
+            capture_time=data["capture_time"],
+            bbox=tuple(data["bbox"]),
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":"))
+
+
+class ChangeTracker:
+    """Track the last text per box id and turn new results into change events.
+
+    Box ids are positions in the result's box list. A box whose bbox moved is
+    reported as a change from the empty string, and boxes that disappear are
+    reported as a change to the empty string.
+    """
+
+    def __init__(self) -> None:
+        self._boxes: Dict[int, OCRBoxResult] = {}
+        self._capture_time = ""
+        self._monitor_index = 0
+        self._image_size: Tuple[int, int] = (0, 0)
+        self._subscribers: List[EventCallback] = []
+        self._lock = threading.Lock()
+        self.subscriber_errors = 0
+        self.last_subscriber_error: Optional[str] = None
+
+    def update(self, result: OCRSessionResult, pts: Optional[float] = None) -> List[TextChangeEvent]:
+        events: List[TextChangeEvent] = []
+        with self._lock:
+            for box_id, box in enumerate(result.boxes):
+                previous = self._boxes.get(box_id)
+                old_text = previous.text if previous and previous.bbox == box.bbox else ""
+                if previous is None or previous.bbox != box.bbox or previous.text != box.text:
+                    events.append(
+                        TextChangeEvent(
+                            box_id=box_id,
+                            old_text=old_text,
+                            new_text=box.text,
+                            confidence=box.confidence,
+                            pts=pts,
+                            capture_time=result.capture_time,
+                            bbox=box.bbox,
+                        )
+                    )
+                self._boxes[box_id] = box
+            for box_id in [box_id for box_id in self._boxes if box_id >= len(result.boxes)]:
+                removed = self._boxes.pop(box_id)
+                if removed.text:
+                    events.append(
+                        TextChangeEvent(
+                            box_id=box_id,
+                            old_text=removed.text,
+                            new_text="",
+                            confidence=0.0,
+                            pts=pts,
+                            capture_time=result.capture_time,
+                            bbox=removed.bbox,
+                        )
+                    )
+            self._capture_time = result.capture_time
+            self._monitor_index = result.monitor_index
+            self._image_size = result.image_size
+            subscribers = list(self._subscribers)
+
+        if events:
+            for callback in subscribers:
+                try:
+                    callback(events)
+                except Exception as exc:
+                    with self._lock:
+                        self.subscriber_errors += 1
+                        self.last_subscriber_error = f"{type(exc).__name__}: {exc}"
+        return events
+
+    def subscribe(self, callback: EventCallback) -> Callable[[], None]:
+        """Register ``callback`` for every non-empty batch; returns an unsubscribe function."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def snapshot(self) -> Optional[OCRSessionResult]:
+        """Rebuild the full current state on demand (``None`` before the first update)."""
+        with self._lock:
+            if not self._capture_time:
+                return None
+            return OCRSessionResult(
+                capture_time=self._capture_time,
+                monitor_index=self._monitor_index,
+                image_size=self._image_size,
+                boxes=[self._boxes[box_id] for box_id in sorted(self._boxes)],
+            )
+
+    def reset(self) -> None:
+        """Forget the tracked texts, e.g. after the box list was edited."""
+        with self._lock:
+            self._boxes.clear()
+            self._capture_time = ""
+
+
+class EventLogWriter:
+    """Append change events to a compact JSON-lines log."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = open(self.path, "a", encoding="utf-8")
+
+    def write(self, events: List[TextChangeEvent]) -> None:
+        if not events:
+            return
+        self._handle.write("".join(event.to_json() + "\n" for event in events))
+        self._handle.flush()
+
+    def close(self) -> None:
+        self._handle.close()
+
+    def __enter__(self) -> "EventLogWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def read_events(path: Union[str, Path]) -> Iterator[TextChangeEvent]:
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield TextChangeEvent.from_dict(json.loads(line))
@@ -1,6 +1,9 @@
+import json
 import os
+import time
+from contextlib import nullcontext
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import tkinter as tk
 from tkinter import messagebox, ttk
@@ -9,14 +12,27 @@ from PIL import Image, ImageTk
 
 from capture_manager import (
     CaptureManager,
+    CaptureState,
     DirectShowCapture,
     SRTStreamCapture,
     list_decklink_devices,
 )
-from ocr_pipeline import OCRProcessor
+from memory_guard import LEVEL_DROP_PREVIEW, LEVEL_REDUCE_DECODE, MemoryGuard
+from ocr_events import ChangeTracker, EventLogWriter
+from ocr_pipeline import DECODERS, BoxConfig, OCRProcessor, preload_backend
+from profiling import PROFILE_MODES, CycleProfiler
 
 OUTPUT_DIR = Path("outputs")
+BOXES_FILE = OUTPUT_DIR / "boxes.json"  # nơi lưu/nạp bounding box và cấu hình từng box
 KEEP_HISTORY = False  # tránh ghi quá nhiều file; bật True nếu muốn lưu lịch sử
+WRITE_EVENT_LOG = True  # ghi các thay đổi text theo box vào outputs/events.jsonl (chỉ khi có thay đổi)
+SNAPSHOT_HEARTBEAT_S = 10  # ghi lại latest_result.json ít nhất mỗi N giây dù text không đổi, để viewer thấy pipeline còn chạy
+MEMORY_CEILING_MB = None  # ví dụ 2048 khi chạy 24/7: gần ngưỡng sẽ tắt preview, vượt ngưỡng sẽ giảm decode SRT/DeckLink
+MEMORY_REPORT_S = 300  # chu kỳ ghi outputs/memory_report.jsonl khi đặt MEMORY_CEILING_MB
+LOW_MEMORY_MAX_FPS = 5
+PRELOAD_OCR_MS = 500  # nạp easyocr/torch nền sau khi cửa sổ hiện; đặt None để chỉ nạp khi chạy OCR
+PROFILE_CYCLES = 0  # >0: tự profile N chu kỳ đầu mỗi lần bật OCR liên tục, kết quả ghi vào outputs/profile_*
+PROFILE_MODE = "sampling"  # "sampling" (mọi thread, file .collapsed cho flamegraph) hoặc "cprofile" (.prof)
 
 DECKLINK_PRESETS = {
     "1080p59.94": {"size": "1920x1080", "fps": "59.94"},
@@ -30,16 +46,35 @@ DECKLINK_PRESETS = {
 class BoundingBoxManager:
     def __init__(self) -> None:
         self.boxes: List[Tuple[int, int, int, int]] = []
+        self.configs: List[BoxConfig] = []
 
-    def add_box(self, box: Tuple[int, int, int, int]) -> None:
+    def add_box(self, box: Tuple[int, int, int, int], config: Optional[BoxConfig] = None) -> None:
         self.boxes.append(box)
+        self.configs.append(config or BoxConfig())
+
+    def set_config(self, index: int, config: BoxConfig) -> None:
+        if 0 <= index < len(self.boxes):
+            self.configs[index] = config
 
     def remove(self, index: int) -> None:
         if 0 <= index < len(self.boxes):
             self.boxes.pop(index)
+            self.configs.pop(index)
 
     def clear(self) -> None:
         self.boxes.clear()
+        self.configs.clear()
+
+    def save(self, path: Path) -> None:
+        data = [{"bbox": list(box), "config": config.to_dict()} for box, config in zip(self.boxes, self.configs)]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def load(self, path: Path) -> None:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        self.clear()
+        for item in data:
+            self.add_box(tuple(item["bbox"]), BoxConfig.from_dict(item.get("config") or {}))
 
 
 class OCRApp:
@@ -59,8 +94,17 @@ class OCRApp:
         self.decklink_fps_var = tk.StringVar(value="60")
         self.decklink_size_var = tk.StringVar(value="1920x1080")
         self.decklink_format_var = tk.StringVar(value="1080p60")
+        self.box_languages_var = tk.StringVar(value="")
+        self.box_allowlist_var = tk.StringVar(value="")
+        self.box_decoder_var = tk.StringVar(value="greedy")
+        self.box_single_line_var = tk.BooleanVar(value=False)
+        self.box_paragraph_var = tk.BooleanVar(value=False)
+        self.box_min_size_var = tk.IntVar(value=20)
         self.auto_running = False
         self.auto_cycles = tk.IntVar(value=0)
+        self.profile_cycles_var = tk.IntVar(value=PROFILE_CYCLES or 20)
+        self.profile_mode_var = tk.StringVar(value=PROFILE_MODE)
+        self.profiler: Optional[CycleProfiler] = None
         self.preview_running = False
         self.decklink_devices: List[str] = []
 
@@ -77,6 +121,15 @@ class OCRApp:
         self.scale_x = 1.0
         self.scale_y = 1.0
         self.box_manager = BoundingBoxManager()
+        self.change_tracker = ChangeTracker()
+        self.memory_guard = MemoryGuard(
+            ceiling_mb=MEMORY_CEILING_MB,
+            report_interval=MEMORY_REPORT_S,
+            report_path=OUTPUT_DIR / "memory_report.jsonl" if MEMORY_CEILING_MB else None,
+            on_level_change=self._on_memory_level,
+        )
+        self.event_log = EventLogWriter(OUTPUT_DIR / "events.jsonl") if WRITE_EVENT_LOG else None
+        self._last_snapshot_write = 0.0
         self.processor = None
         self.processor_config: Tuple[Tuple[str, ...], bool] = (tuple(), False)
 
@@ -84,6 +137,8 @@ class OCRApp:
         self._apply_decklink_preset()
         self._refresh_decklink_devices(initial=True)
         self._start_live_preview()
+        if PRELOAD_OCR_MS is not None:
+            self.root.after(PRELOAD_OCR_MS, preload_backend)
 
     def _build_layout(self) -> None:
         control_frame = ttk.Frame(self.root, padding=10)
@@ -156,6 +211,13 @@ class OCRApp:
         self.auto_button.pack(fill=tk.X, pady=4)
         ttk.Label(control_frame, text="Chu kỳ đã chạy:").pack(anchor=tk.W)
         ttk.Label(control_frame, textvariable=self.auto_cycles, foreground="#9b2226").pack(anchor=tk.W)
+        profile_row = ttk.Frame(control_frame)
+        profile_row.pack(fill=tk.X, pady=2)
+        ttk.Entry(profile_row, textvariable=self.profile_cycles_var, width=5).pack(side=tk.LEFT)
+        ttk.Combobox(
+            profile_row, textvariable=self.profile_mode_var, values=list(PROFILE_MODES), width=9, state="readonly"
+        ).pack(side=tk.LEFT, padx=4)
+        ttk.Button(profile_row, text="Profile N chu kỳ", command=self.arm_profiler).pack(side=tk.LEFT, expand=True, fill=tk.X)
 
         ttk.Label(control_frame, text="Auto preview", font=("Arial", 12, "bold")).pack(anchor=tk.W, pady=(10, 0))
         preview_row = ttk.Frame(control_frame)
@@ -169,10 +231,35 @@ class OCRApp:
         self.box_list = tk.Listbox(control_frame, height=10)
         self.box_list.pack(fill=tk.X, pady=4)
 
+        box_lang_row = ttk.Frame(control_frame)
+        box_lang_row.pack(fill=tk.X, pady=2)
+        ttk.Label(box_lang_row, text="Box languages:").pack(side=tk.LEFT)
+        ttk.Entry(box_lang_row, textvariable=self.box_languages_var, width=10).pack(side=tk.LEFT, padx=4)
+        ttk.Label(box_lang_row, text="Decoder:").pack(side=tk.LEFT)
+        ttk.Combobox(
+            box_lang_row, textvariable=self.box_decoder_var, values=list(DECODERS), width=12, state="readonly"
+        ).pack(side=tk.LEFT, padx=2)
+
+        box_allow_row = ttk.Frame(control_frame)
+        box_allow_row.pack(fill=tk.X, pady=2)
+        ttk.Label(box_allow_row, text="Allowlist:").pack(side=tk.LEFT)
+        ttk.Entry(box_allow_row, textvariable=self.box_allowlist_var, width=14).pack(side=tk.LEFT, padx=4)
+        ttk.Checkbutton(box_allow_row, text="Một dòng", variable=self.box_single_line_var).pack(side=tk.LEFT)
+        box_detect_row = ttk.Frame(control_frame)
+        box_detect_row.pack(fill=tk.X, pady=2)
+        ttk.Checkbutton(box_detect_row, text="Paragraph", variable=self.box_paragraph_var).pack(side=tk.LEFT)
+        ttk.Label(box_detect_row, text="Min size (px):").pack(side=tk.LEFT, padx=(8, 0))
+        ttk.Entry(box_detect_row, textvariable=self.box_min_size_var, width=5).pack(side=tk.LEFT, padx=4)
+        ttk.Button(control_frame, text="Áp dụng cho box đã chọn", command=self.apply_config_to_selected).pack(fill=tk.X, pady=2)
+
         box_actions = ttk.Frame(control_frame)
         box_actions.pack(fill=tk.X)
         ttk.Button(box_actions, text="Remove selected", command=self.remove_selected_box).pack(side=tk.LEFT, expand=True, fill=tk.X)
         ttk.Button(box_actions, text="Clear", command=self.clear_boxes).pack(side=tk.LEFT, expand=True, fill=tk.X)
+        box_file_actions = ttk.Frame(control_frame)
+        box_file_actions.pack(fill=tk.X)
+        ttk.Button(box_file_actions, text="Lưu box", command=self.save_boxes).pack(side=tk.LEFT, expand=True, fill=tk.X)
+        ttk.Button(box_file_actions, text="Nạp box", command=self.load_boxes).pack(side=tk.LEFT, expand=True, fill=tk.X)
 
         ttk.Label(control_frame, text="Status", font=("Arial", 12, "bold")).pack(anchor=tk.W, pady=(10, 0))
         self.status_var = tk.StringVar(value="Ready")
@@ -266,6 +353,9 @@ class OCRApp:
         if not self.preview_running:
             return
         try:
+            if self.memory_guard.check() >= LEVEL_DROP_PREVIEW:
+                self.status_var.set(f"Preview tạm dừng: bộ nhớ cao ({self.memory_guard.rss_mb:.0f} MB)")
+                return
             live_image = self._grab_current_frame()
             self.image = live_image
             self._display_image(live_image)
@@ -287,7 +377,11 @@ class OCRApp:
         self.scale_y = img_height / display_height
         resized = image.resize((display_width, display_height))
         self.display_image = resized
-        self.photo = ImageTk.PhotoImage(resized)
+        if self.photo is not None and (self.photo.width(), self.photo.height()) == resized.size:
+            # reuse the Tk image instead of allocating a new PhotoImage every refresh
+            self.photo.paste(resized)
+        else:
+            self.photo = ImageTk.PhotoImage(resized)
         self.canvas.delete("all")
         self.canvas.create_image(0, 0, image=self.photo, anchor=tk.NW)
         self.canvas.config(scrollregion=self.canvas.bbox(tk.ALL))
@@ -315,15 +409,39 @@ class OCRApp:
             int(x2 * self.scale_x),
             int(y2 * self.scale_y),
         )
-        self.box_manager.add_box(scaled_box)
+        self.box_manager.add_box(scaled_box, self._current_box_config())
         self._update_box_list()
         self.canvas_rect = None
         self._draw_boxes()
 
+    def _current_box_config(self) -> BoxConfig:
+        languages = [lang.strip() for lang in self.box_languages_var.get().split(",") if lang.strip()]
+        try:
+            min_size = max(1, int(self.box_min_size_var.get()))
+        except (TypeError, ValueError, tk.TclError):
+            min_size = 20
+        return BoxConfig(
+            languages=languages or None,
+            allowlist=self.box_allowlist_var.get() or None,
+            decoder=self.box_decoder_var.get() or "greedy",
+            paragraph=self.box_paragraph_var.get(),
+            min_size=min_size,
+            single_line=self.box_single_line_var.get(),
+        )
+
+    def apply_config_to_selected(self) -> None:
+        selection = self.box_list.curselection()
+        if not selection:
+            messagebox.showwarning("Box", "Hãy chọn một bounding box trong danh sách.")
+            return
+        self.box_manager.set_config(selection[0], self._current_box_config())
+        self._update_box_list()
+
     def _update_box_list(self) -> None:
         self.box_list.delete(0, tk.END)
-        for idx, box in enumerate(self.box_manager.boxes):
-            self.box_list.insert(tk.END, f"{idx+1}: {box}")
+        for idx, (box, config) in enumerate(zip(self.box_manager.boxes, self.box_manager.configs)):
+            summary = config.describe()
+            self.box_list.insert(tk.END, f"{idx+1}: {box}" + (f" [{summary}]" if summary else ""))
 
     def _draw_boxes(self) -> None:
         if not self.display_image:
@@ -347,13 +465,38 @@ class OCRApp:
         if not selection:
             return
         self.box_manager.remove(selection[0])
+        # box ids are list positions, so removing one shifts the ids behind it
+        self.change_tracker.reset()
         self._update_box_list()
         self._draw_boxes()
 
     def clear_boxes(self) -> None:
         self.box_manager.clear()
+        self.change_tracker.reset()
+        self._update_box_list()
+        self._draw_boxes()
+
+    def save_boxes(self) -> None:
+        if not self.box_manager.boxes:
+            messagebox.showwarning("Box", "Chưa có bounding box nào để lưu.")
+            return
+        try:
+            self.box_manager.save(BOXES_FILE)
+        except OSError as exc:
+            messagebox.showerror("Box", f"Không lưu được {BOXES_FILE}: {exc}")
+            return
+        self.status_var.set(f"Đã lưu {len(self.box_manager.boxes)} box vào {BOXES_FILE}")
+
+    def load_boxes(self) -> None:
+        try:
+            self.box_manager.load(BOXES_FILE)
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            messagebox.showerror("Box", f"Không nạp được {BOXES_FILE}: {exc}")
+            return
+        self.change_tracker.reset()
         self._update_box_list()
         self._draw_boxes()
+        self.status_var.set(f"Đã nạp {len(self.box_manager.boxes)} box từ {BOXES_FILE}")
 
     def run_ocr(self) -> None:
         if not self.image:
@@ -371,7 +514,7 @@ class OCRApp:
         self.status_var.set("Đang chạy EasyOCR...")
         self.root.update_idletasks()
         try:
-            result, latest_path = self._process_ocr(self.image, languages, show_dialog=True)
+            result, latest_path, _events = self._process_ocr(self.image, languages, show_dialog=True)
             self.status_var.set(f"Hoàn thành! Lưu JSON tại {latest_path}")
         except Exception as exc:
             messagebox.showerror("OCR failed", f"Lỗi khi chạy EasyOCR: {exc}")
@@ -379,11 +522,30 @@ class OCRApp:
 
     def _process_ocr(self, image: Image.Image, languages: List[str], show_dialog: bool = False):
         processor = self._get_processor(languages)
-        result = processor.run(image, self.box_manager.boxes, monitor_index=self.monitor_index.get())
-        latest_path = processor.save_result(result, OUTPUT_DIR, keep_history=KEEP_HISTORY)
+        result = processor.run(
+            image,
+            self.box_manager.boxes,
+            monitor_index=self.monitor_index.get(),
+            box_configs=self.box_manager.configs,
+        )
+        events = self.change_tracker.update(result, pts=self._current_pts())
+        latest_path = OUTPUT_DIR / "latest_result.json"
+        # rewrite the snapshot when some box changed (or the user asked for it), plus a periodic
+        # heartbeat so viewers showing capture_time do not mistake a static screen for a stall
+        heartbeat_due = time.monotonic() - self._last_snapshot_write >= SNAPSHOT_HEARTBEAT_S
+        if events or show_dialog or heartbeat_due or not latest_path.exists():
+            latest_path = processor.save_result(result, OUTPUT_DIR, keep_history=KEEP_HISTORY)
+            self._last_snapshot_write = time.monotonic()
+        if events and self.event_log is not None:
+            self.event_log.write(events)
         if show_dialog:
             self._show_result_dialog(latest_path, result.boxes)
-        return result, latest_path
+        return result, latest_path, events
+
+    def _current_pts(self) -> Optional[float]:
+        source = self.source_var.get()
+        capture = self.srt_capture if source == "srt" else self.decklink_capture if source == "decklink" else None
+        return capture.latest_pts if capture else None
 
     def _get_processor(self, languages: List[str]) -> OCRProcessor:
         config = (tuple(languages), self.gpu_var.get())
@@ -417,11 +579,16 @@ class OCRApp:
             job = getattr(self, "_auto_job", None)
             if job:
                 self.root.after_cancel(job)
+            if self.profiler and self.profiler.active:
+                # dump the cycles profiled so far instead of dropping them
+                self.profiler.stop()
             self.auto_cycles.set(0)
             self.auto_button.config(text="Bật OCR liên tục")
             return
 
         self.interval_ms_var.set(interval)
+        if PROFILE_CYCLES and not (self.profiler and self.profiler.active):
+            self._arm_profiler(PROFILE_CYCLES, PROFILE_MODE)
         self.auto_running = True
         self.status_var.set("Đang chạy OCR liên tục...")
         self.auto_cycles.set(0)
@@ -432,26 +599,62 @@ class OCRApp:
         if not self.auto_running:
             return
 
+        profiler = self.profiler if self.profiler and not self.profiler.done else None
         try:
-            live_image = self._grab_current_frame()
-            self.image = live_image
-            self._display_image(live_image)
-            languages = [lang.strip() for lang in self.languages_var.get().split(",") if lang.strip()]
-            if not languages:
-                raise ValueError("Languages rỗng; hãy nhập ví dụ en,vi")
-
-            self.status_var.set("OCR liên tục: đang đọc...")
-            result, latest_path = self._process_ocr(live_image, languages, show_dialog=False)
-            self.auto_cycles.set(self.auto_cycles.get() + 1)
-            self.status_var.set(
-                f"OCR liên tục #{self.auto_cycles.get()} | JSON: {latest_path.name} (ghi đè)"
-            )
+            with profiler.cycle() if profiler else nullcontext():
+                live_image = self._grab_current_frame()
+                self.image = live_image
+                if self.memory_guard.check() < LEVEL_DROP_PREVIEW:
+                    self._display_image(live_image)
+                languages = [lang.strip() for lang in self.languages_var.get().split(",") if lang.strip()]
+                if not languages:
+                    raise ValueError("Languages rỗng; hãy nhập ví dụ en,vi")
+
+                self.status_var.set("OCR liên tục: đang đọc...")
+                if profiler:
+                    profiler.watch(self._get_processor(languages))
+                result, latest_path, events = self._process_ocr(live_image, languages, show_dialog=False)
+                self.auto_cycles.set(self.auto_cycles.get() + 1)
+                if not (profiler and profiler.done):
+                    self.status_var.set(
+                        f"OCR liên tục #{self.auto_cycles.get()} | {len(events)} box thay đổi | JSON: {latest_path.name}"
+                    )
         except Exception as exc:
             self.status_var.set(f"OCR liên tục lỗi: {exc}")
         finally:
             if self.auto_running:
                 self._auto_job = self.root.after(self.interval_ms_var.get(), self._run_auto_ocr)
 
+    def arm_profiler(self) -> None:
+        try:
+            cycles = int(self.profile_cycles_var.get())
+        except (TypeError, ValueError, tk.TclError):
+            messagebox.showwarning("Profile", "Số chu kỳ phải là số nguyên.")
+            return
+        if cycles <= 0:
+            messagebox.showwarning("Profile", "Số chu kỳ phải lớn hơn 0.")
+            return
+        if self.profiler and self.profiler.active:
+            messagebox.showinfo("Profile", "Đang profile, hãy chờ lượt hiện tại kết thúc.")
+            return
+        self._arm_profiler(cycles, self.profile_mode_var.get())
+        if self.auto_running:
+            self.status_var.set(f"Sẽ profile {cycles} chu kỳ OCR tiếp theo ({self.profiler.mode})")
+        else:
+            self.status_var.set(f"Sẽ profile {cycles} chu kỳ khi bật OCR liên tục ({self.profiler.mode})")
+
+    def _arm_profiler(self, cycles: int, mode: str) -> None:
+        self.profiler = CycleProfiler(
+            cycles=cycles, mode=mode, output_dir=OUTPUT_DIR, processor=self.processor, on_done=self._on_profile_done
+        )
+
+    def _on_profile_done(self, summary: Dict) -> None:
+        self.status_var.set(
+            f"Profile {summary['cycles']} chu kỳ: {summary['mean_cycle_ms']:.0f} ms/chu kỳ | "
+            f"detect {summary['detect_s']:.2f}s, recognize {summary['recognize_s']:.2f}s, "
+            f"glue {summary['glue_s']:.2f}s | torch ops: {summary['torch_ops']} | {Path(summary['files'][0]).name}"
+        )
+
     def _show_result_dialog(self, path: Path, boxes: List[Tuple[int, int, int, int]]) -> None:
         dialog = tk.Toplevel(self.root)
         dialog.title("OCR Result")
@@ -471,6 +674,7 @@ class OCRApp:
         if self.source_var.get() == "srt":
             if not self.srt_capture or not self.srt_capture.running:
                 raise RuntimeError("Chưa kết nối SRT hoặc stream chưa sẵn sàng.")
+            self._check_stream_live(self.srt_capture, "SRT")
             frame = self.srt_capture.get_latest_frame()
             if frame is None:
                 raise RuntimeError("Chưa nhận frame từ SRT. Hãy đợi vài giây hoặc kiểm tra URL.")
@@ -479,6 +683,7 @@ class OCRApp:
         if self.source_var.get() == "decklink":
             if not self.decklink_capture or not self.decklink_capture.running:
                 raise RuntimeError("Chưa kết nối DeckLink (DirectShow) hoặc stream chưa sẵn sàng.")
+            self._check_stream_live(self.decklink_capture, "DeckLink")
             frame = self.decklink_capture.get_latest_frame()
             if frame is None:
                 raise RuntimeError("Chưa nhận frame từ DeckLink (dshow). Kiểm tra thiết bị/độ phân giải.")
@@ -487,6 +692,28 @@ class OCRApp:
         self.capture_manager.monitor_index = self.monitor_index.get()
         return self.capture_manager.grab_frame()
 
+    def _check_stream_live(self, capture, label: str) -> None:
+        """Raise while a supervised stream is (re)connecting so callers skip stale frames."""
+        health = capture.health()
+        if health.state in (CaptureState.LIVE, CaptureState.STALLED) and capture.get_latest_frame() is not None:
+            return
+        if health.state == CaptureState.CONNECTING and health.connects == 0:
+            return
+        detail = f": {health.last_error}" if health.last_error else ""
+        raise RuntimeError(
+            f"{label} {health.state} (reconnect #{health.reconnects}){detail}"
+        )
+
+    def _on_memory_level(self, level: int) -> None:
+        max_fps = LOW_MEMORY_MAX_FPS if level >= LEVEL_REDUCE_DECODE else None
+        for capture in (self.srt_capture, self.decklink_capture):
+            if capture:
+                capture.max_fps = max_fps
+        if level >= LEVEL_REDUCE_DECODE:
+            self.status_var.set(
+                f"Bộ nhớ vượt ngưỡng: chỉ lưu {LOW_MEMORY_MAX_FPS} fps, bỏ decode frame không cần thiết"
+            )
+
     def connect_srt(self) -> None:
         url = self.srt_url_var.get().strip()
         if not url:
@@ -496,6 +723,7 @@ class OCRApp:
         if self.srt_capture:
             self.srt_capture.stop()
         self.srt_capture = SRTStreamCapture(url)
+        self._on_memory_level(self.memory_guard.level)
         self.srt_capture.start()
         self.source_var.set("srt")
         self.status_var.set("Đang kết nối tới SRT... chờ khung hình đầu tiên")
@@ -513,6 +741,7 @@ class OCRApp:
         if self.decklink_capture:
             self.decklink_capture.stop()
         self.decklink_capture = DirectShowCapture(device=device, video_size=size, fps=fps)
+        self._on_memory_level(self.memory_guard.level)
         self.decklink_capture.start()
         self.source_var.set("decklink")
         self._ensure_preview_running()
@@ -523,7 +752,7 @@ class OCRApp:
         if not self.decklink_capture:
             return
 
-        if self.decklink_capture.error:
+        if self.decklink_capture.error and not self.decklink_capture.running:
             self.status_var.set(f"DeckLink (dshow) lỗi: {self.decklink_capture.error}")
             messagebox.showerror("DeckLink", f"Không nhận được khung hình DirectShow: {self.decklink_capture.error}")
             return
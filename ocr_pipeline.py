@@ -1,89 +1,283 @@
 import datetime
 import json
-from dataclasses import dataclass, asdict
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 import numpy as np
 from PIL import Image
 
-import easyocr
+if TYPE_CHECKING:
+    import easyocr
 
+_easyocr = None
+_backend_lock = threading.Lock()
 
-@dataclass
+
+def load_backend():
+    """Import easyocr (and torch through it) on first use instead of at module import."""
+    global _easyocr
+    if _easyocr is None:
+        with _backend_lock:
+            if _easyocr is None:
+                import easyocr
+
+                _easyocr = easyocr
+    return _easyocr
+
+
+def preload_backend() -> threading.Thread:
+    """Import the OCR backend in a daemon thread so the first OCR does not pay for it."""
+    thread = threading.Thread(target=load_backend, name="easyocr-preload", daemon=True)
+    thread.start()
+    return thread
+
+
+@dataclass(slots=True)
 class OCRBoxResult:
     bbox: Tuple[int, int, int, int]
     text: str
     confidence: float
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {"bbox": self.bbox, "text": self.text, "confidence": self.confidence}
 
-@dataclass
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "OCRBoxResult":
+        return cls(bbox=tuple(data["bbox"]), text=data["text"], confidence=float(data["confidence"]))
+
+
+@dataclass(slots=True)
 class OCRSessionResult:
     capture_time: str
     monitor_index: int
     image_size: Tuple[int, int]
     boxes: List[OCRBoxResult]
 
-    def to_json(self) -> str:
-        return json.dumps({
+    def to_dict(self) -> Dict[str, Any]:
+        return {
             "capture_time": self.capture_time,
             "monitor_index": self.monitor_index,
             "image_size": self.image_size,
-            "boxes": [asdict(box) for box in self.boxes],
-        }, ensure_ascii=False, indent=2)
+            "boxes": [box.to_dict() for box in self.boxes],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "OCRSessionResult":
+        return cls(
+            capture_time=data["capture_time"],
+            monitor_index=int(data["monitor_index"]),
+            image_size=tuple(data["image_size"]),
+            boxes=[OCRBoxResult.from_dict(box) for box in data["boxes"]],
+        )
+
+    def to_json(self, compact: bool = False) -> str:
+        """Serialize to JSON; ``compact`` drops indentation and spaces for high-rate writers."""
+        if compact:
+            return json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":"))
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+
+def crop_region(image: Image.Image, bbox: Tuple[int, int, int, int]) -> np.ndarray:
+    """Crop ``bbox`` (x1, y1, x2, y2) out of ``image`` as an RGB array; needs no OCR backend."""
+    left, top, right, bottom = bbox
+    cropped = image.crop((left, top, right, bottom))
+    return np.array(cropped)
+
+
+DECODERS = ("greedy", "beamsearch", "wordbeamsearch")
+
+
+@dataclass
+class BoxConfig:
+    """Recognizer settings for a single bounding box.
+
+    ``languages=None`` falls back to the processor languages. Narrowing the
+    language set, ``allowlist`` (e.g. ``"0123456789:"`` for a clock) or skipping
+    text detection with ``single_line`` shrinks EasyOCR's search space, which
+    is both faster and more accurate.
+    """
+
+    languages: Optional[List[str]] = None
+    allowlist: Optional[str] = None
+    decoder: str = "greedy"
+    paragraph: bool = False
+    min_size: int = 20
+    single_line: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "languages": self.languages,
+            "allowlist": self.allowlist,
+            "decoder": self.decoder,
+            "paragraph": self.paragraph,
+            "min_size": self.min_size,
+            "single_line": self.single_line,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BoxConfig":
+        return cls(**{key: data[key] for key in cls().to_dict() if key in data})
+
+    def describe(self) -> str:
+        parts = []
+        if self.languages:
+            parts.append(",".join(self.languages))
+        if self.allowlist:
+            parts.append(f"allow={self.allowlist}")
+        if self.decoder != "greedy":
+            parts.append(self.decoder)
+        if self.paragraph:
+            parts.append("paragraph")
+        if self.min_size != 20:
+            parts.append(f"min={self.min_size}")
+        if self.single_line:
+            parts.append("1 dòng")
+        return " ".join(parts)
 
 
 class OCRProcessor:
-    """Wrap EasyOCR with helper utilities."""
+    """Wrap EasyOCR with helper utilities.
+
+    Readers are cached per language set, so boxes that share languages share a
+    reader (and its loaded models). At most ``max_readers`` are kept; the least
+    recently used extra reader is dropped first. On CPU, ``easyocr.Reader``
+    already applies PyTorch dynamic int8 quantization by default
+    (``quantize=True``), so readers are created with EasyOCR's defaults.
+    """
 
-    def __init__(self, languages: List[str], gpu: bool = False) -> None:
+    def __init__(self, languages: List[str], gpu: bool = False, max_readers: int = 4) -> None:
         self.languages = languages
         self.gpu = gpu
-        self.reader = easyocr.Reader(languages, gpu=gpu)
+        self.max_readers = max(1, max_readers)
+        self._readers: "OrderedDict[Tuple[str, ...], easyocr.Reader]" = OrderedDict()
+        self._readers_lock = threading.Lock()
+        self.reader = self.get_reader(languages)
+
+    def get_reader(self, languages: Optional[List[str]] = None) -> "easyocr.Reader":
+        key = tuple(languages or self.languages)
+        with self._readers_lock:
+            reader = self._readers.get(key)
+            if reader is None:
+                reader = load_backend().Reader(list(key), gpu=self.gpu)
+                self._readers[key] = reader
+                default_key = tuple(self.languages)
+                for stale_key in list(self._readers):
+                    if len(self._readers) <= self.max_readers:
+                        break
+                    if stale_key not in (key, default_key):
+                        del self._readers[stale_key]
+            else:
+                self._readers.move_to_end(key)
+            return reader
 
     def _crop_region(self, image: Image.Image, bbox: Tuple[int, int, int, int]) -> np.ndarray:
-        left, top, right, bottom = bbox
-        cropped = image.crop((left, top, right, bottom))
-        return np.array(cropped)
+        return crop_region(image, bbox)
+
+    def readers(self) -> List["easyocr.Reader"]:
+        """Readers loaded so far (e.g. for instrumentation)."""
+        with self._readers_lock:
+            return list(self._readers.values())
+
+    def crop_regions(self, image: Image.Image, bboxes: List[Tuple[int, int, int, int]]) -> List[np.ndarray]:
+        return [crop_region(image, bbox) for bbox in bboxes]
+
+    @staticmethod
+    def _paragraph_text(ocr_result: List[Tuple[Any, str, float]]) -> str:
+        """Group line detections into paragraphs the way ``readtext(paragraph=True)`` does."""
+        load_backend()
+        from easyocr.utils import get_paragraph
 
-    def run(self, image: Image.Image, bboxes: List[Tuple[int, int, int, int]], monitor_index: int) -> OCRSessionResult:
+        return " ".join(text for _, text in get_paragraph(ocr_result)).strip()
+
+    def read_region(self, region: np.ndarray, config: Optional[BoxConfig] = None) -> Tuple[str, float]:
+        """Run EasyOCR on one cropped region and return the joined text and mean confidence."""
+        if config is None:
+            ocr_result = self.reader.readtext(region, detail=1)
+        else:
+            reader = self.get_reader(config.languages)
+            # paragraph grouping is done below: EasyOCR's paragraph mode drops the confidences
+            if config.single_line:
+                # the crop already is the text line: skip the CRAFT detector entirely
+                ocr_result = reader.recognize(
+                    region, decoder=config.decoder, allowlist=config.allowlist, detail=1, paragraph=False
+                )
+            else:
+                ocr_result = reader.readtext(
+                    region,
+                    detail=1,
+                    decoder=config.decoder,
+                    allowlist=config.allowlist,
+                    paragraph=False,
+                    min_size=config.min_size,
+                )
+            if config.paragraph and ocr_result:
+                return self._paragraph_text(ocr_result), float(np.mean([item[2] for item in ocr_result]))
+        text_parts = []
+        confidences = []
+        for item in ocr_result:
+            # EasyOCR returns (bbox, text, confidence)
+            if len(item) >= 3:
+                _, text, conf = item
+            else:
+                text, conf = item[1], item[2] if len(item) > 2 else 0.0
+            text_parts.append(text)
+            confidences.append(conf)
+        text = " ".join(text_parts).strip()
+        confidence = float(np.mean(confidences)) if confidences else 0.0
+        return text, confidence
+
+    def run_crops(
+        self,
+        regions: List[np.ndarray],
+        bboxes: List[Tuple[int, int, int, int]],
+        image_size: Tuple[int, int],
+        monitor_index: int,
+        capture_time: Optional[str] = None,
+        box_configs: Optional[List[Optional[BoxConfig]]] = None,
+    ) -> OCRSessionResult:
+        """OCR regions that were already cropped (e.g. by a separate preprocess stage)."""
         results: List[OCRBoxResult] = []
-        for bbox in bboxes:
-            cropped_arr = self._crop_region(image, bbox)
-            ocr_result = self.reader.readtext(cropped_arr, detail=1)
-            text_parts = []
-            confidences = []
-            for item in ocr_result:
-                # EasyOCR returns (bbox, text, confidence)
-                if len(item) >= 3:
-                    _, text, conf = item
-                else:
-                    text, conf = item[1], item[2] if len(item) > 2 else 0.0
-                text_parts.append(text)
-                confidences.append(conf)
-            text = " ".join(text_parts).strip()
-            confidence = float(np.mean(confidences)) if confidences else 0.0
+        configs = box_configs or [None] * len(bboxes)
+        for region, bbox, config in zip(regions, bboxes, configs):
+            text, confidence = self.read_region(region, config)
             results.append(OCRBoxResult(bbox=bbox, text=text, confidence=confidence))
 
-        capture_time = datetime.datetime.now().isoformat()
+        if capture_time is None:
+            capture_time = datetime.datetime.now().isoformat()
         session = OCRSessionResult(
             capture_time=capture_time,
             monitor_index=monitor_index,
-            image_size=image.size,
+            image_size=image_size,
             boxes=results,
         )
         return session
 
-    def save_result(self, result: OCRSessionResult, output_dir: Path, keep_history: bool = False) -> Path:
+    def run(
+        self,
+        image: Image.Image,
+        bboxes: List[Tuple[int, int, int, int]],
+        monitor_index: int,
+        box_configs: Optional[List[Optional[BoxConfig]]] = None,
+    ) -> OCRSessionResult:
+        return self.run_crops(
+            self.crop_regions(image, bboxes), bboxes, image.size, monitor_index, box_configs=box_configs
+        )
+
+    def save_result(
+        self, result: OCRSessionResult, output_dir: Path, keep_history: bool = False, compact: bool = False
+    ) -> Path:
         """Persist the latest OCR session as JSON.
 
         When ``keep_history`` is False (mặc định), chỉ ghi đè một file ``latest_result.json``
         để tránh tạo quá nhiều file trên máy. Nếu cần lưu lại lịch sử, bật ``keep_history``
-        để ghi thêm file timestamp.
+        để ghi thêm file timestamp. ``compact`` ghi JSON không thụt lề (nhanh và nhỏ hơn).
         """
 
         output_dir.mkdir(parents=True, exist_ok=True)
-        json_data = result.to_json()
+        json_data = result.to_json(compact=compact)
 
         latest_path = output_dir / "latest_result.json"
         latest_path.write_text(json_data, encoding="utf-8")
@@ -0,0 +1,371 @@
+"""Opt-in profiling of N OCR cycles in a running app.
+
+``CycleProfiler`` starts when the first wrapped cycle begins and stops after
+``cycles`` cycles, then writes its output to ``output_dir``:
+
+* ``mode="sampling"`` samples the stacks of *every* thread (auto-OCR loop,
+  capture/decode threads, executor workers) and writes collapsed stacks
+  (``*.collapsed``) that ``flamegraph.pl`` and speedscope read directly.
+* ``mode="cprofile"`` runs ``cProfile`` on the looping thread and writes a
+  ``*.prof`` file (snakeviz, flameprof, gprof2dot) plus a text summary.
+
+When a processor is given, EasyOCR's ``detect`` and ``recognize`` are timed
+per reader, on whichever thread runs them. The ``*_summary.json`` file splits
+the wall time into detection, recognition and the remaining Python glue.
+
+Op-level torch timing (``*_torch_ops.txt`` plus a Chrome trace) needs torch to
+be loaded already when profiling starts; otherwise it is skipped and
+``torch_ops`` in the summary says so. OCR usually runs on other threads than
+the loop (executor threads in ``AsyncOCRPipeline``), and ``torch.profiler``
+only sees the thread that enabled it, so the profiler is started with
+``profile_all_threads`` where this PyTorch supports it. On older versions each
+``detect``/``recognize`` call is profiled on its own thread instead, one call
+at a time (calls overlapping a profiled one are timed but not op-profiled).
+"""
+
+import cProfile
+import datetime
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+PROFILE_MODES = ("sampling", "cprofile")
+
+
+class StackSampler:
+    """Sample all thread stacks at a fixed interval into collapsed-stack counts."""
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write_collapsed(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as handle:
+            for stack, count in self.counts.most_common():
+                handle.write(f"{stack} {count}\n")
+
+
+class _TorchOpRecorder:
+    """Op-level CPU times of the torch work inside EasyOCR's stages."""
+
+    def __init__(self, torch) -> None:
+        self.torch = torch
+        self.mode = "per_call"
+        self.calls_profiled = 0
+        self.calls_skipped = 0
+        self._profile = None
+        self._last_call = None
+        self._totals: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        activities = [self.torch.profiler.ProfilerActivity.CPU]
+        try:
+            from torch._C._profiler import _ExperimentalConfig
+
+            config = _ExperimentalConfig(profile_all_threads=True)
+        except (ImportError, TypeError):
+            return
+        self._profile = self.torch.profiler.profile(activities=activities, experimental_config=config)
+        self._profile.__enter__()
+        self.mode = "all_threads"
+
+    def stop(self) -> None:
+        if self._profile is not None:
+            self._profile.__exit__(None, None, None)
+
+    @contextmanager
+    def call(self) -> Iterator[None]:
+        if self.mode != "per_call":
+            yield
+            return
+        if not self._lock.acquire(blocking=False):
+            # torch allows one active profiler; an overlapping call is only timed
+            self.calls_skipped += 1
+            yield
+            return
+        try:
+            with self.torch.profiler.profile(activities=[self.torch.profiler.ProfilerActivity.CPU]) as profile:
+                yield
+            for event in profile.key_averages():
+                totals = self._totals.setdefault(event.key, [0, 0.0, 0.0])
+                totals[0] += event.count
+                totals[1] += event.self_cpu_time_total
+                totals[2] += event.cpu_time_total
+            self._last_call = profile
+            self.calls_profiled += 1
+        finally:
+            self._lock.release()
+
+    def write(self, stem: Path) -> List[str]:
+        ops_path = Path(f"{stem}_torch_ops.txt")
+        trace_path = Path(f"{stem}_torch_trace.json")
+        if self._profile is not None:
+            ops_path.write_text(
+                self._profile.key_averages().table(sort_by="self_cpu_time_total", row_limit=40), encoding="utf-8"
+            )
+            self._profile.export_chrome_trace(str(trace_path))
+            return [str(ops_path), str(trace_path)]
+        lines = [
+            f"# profiled {self.calls_profiled} stage calls one by one, {self.calls_skipped} overlapping calls skipped",
+            f"{'op':<60} {'calls':>8} {'self ms':>10} {'total ms':>10}",
+        ]
+        ranked = sorted(self._totals.items(), key=lambda item: item[1][1], reverse=True)
+        for name, (count, self_us, total_us) in ranked[:40]:
+            lines.append(f"{name[:60]:<60} {int(count):>8} {self_us / 1000:>10.2f} {total_us / 1000:>10.2f}")
+        ops_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        files = [str(ops_path)]
+        if self._last_call is not None:
+            # a trace of the last profiled call; per-call profiles cannot be merged into one timeline
+            self._last_call.export_chrome_trace(str(trace_path))
+            files.append(str(trace_path))
+        return files
+
+
+class _StageTimer:
+    """Wrap a reader's ``detect``/``recognize`` bound methods to accumulate their time."""
+
+    STAGES = ("detect", "recognize")
+
+    def __init__(self) -> None:
+        self.seconds: Dict[str, float] = {stage: 0.0 for stage in self.STAGES}
+        self.calls: Dict[str, int] = {stage: 0 for stage in self.STAGES}
+        self._patched: List[object] = []
+        self._lock = threading.Lock()
+        self.ops: Optional[_TorchOpRecorder] = None
+
+    def attach(self, reader: object) -> None:
+        if any(patched is reader for patched in self._patched):
+            return
+        for stage in self.STAGES:
+            original = getattr(reader, stage, None)
+            if original is None:
+                continue
+            setattr(reader, stage, self._wrap(stage, original))
+        self._patched.append(reader)
+
+    def detach(self) -> None:
+        for reader in self._patched:
+            for stage in self.STAGES:
+                # drop the instance attribute so the class method is visible again
+                reader.__dict__.pop(stage, None)
+        self._patched.clear()
+
+    def _wrap(self, stage: str, original: Callable) -> Callable:
+        def timed(*args, **kwargs):
+            # read once: stop() may clear self.ops while another thread is inside this call
+            ops = self.ops
+            started = time.perf_counter()
+            try:
+                if ops is None:
+                    return original(*args, **kwargs)
+                with ops.call():
+                    return original(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.seconds[stage] += time.perf_counter() - started
+                    self.calls[stage] += 1
+
+        return timed
+
+
+class CycleProfiler:
+    """Profile the next ``cycles`` loop iterations and dump the results."""
+
+    def __init__(
+        self,
+        cycles: int = 20,
+        mode: str = "sampling",
+        output_dir: Path = Path("outputs"),
+        sample_interval: float = 0.005,
+        torch_ops: bool = True,
+        processor=None,
+        on_done: Optional[Callable[[Dict], None]] = None,
+    ) -> None:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Chế độ profile không hợp lệ: {mode} (chọn một trong {', '.join(PROFILE_MODES)})")
+        self.cycles = max(1, cycles)
+        self.mode = mode
+        self.output_dir = Path(output_dir)
+        self.sample_interval = sample_interval
+        self.torch_ops = torch_ops
+        self.processor = processor
+        self.on_done = on_done
+        self.completed = 0
+        self.summary: Optional[Dict] = None
+        self._active = False
+        self._started = 0.0
+        self._cycle_seconds = 0.0
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[StackSampler] = None
+        self._torch_ops: Optional[_TorchOpRecorder] = None
+        self._torch_status = "disabled"
+        self._stages = _StageTimer()
+
+    @property
+    def active(self) -> bool:
+        return self._active
+
+    @property
+    def done(self) -> bool:
+        return self.summary is not None
+
+    @contextmanager
+    def cycle(self) -> Iterator[None]:
+        """Wrap one loop iteration; profiling starts on the first and stops after the last."""
+        if self.done:
+            yield
+            return
+        if not self._active:
+            self.start()
+        self._attach_readers()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._cycle_seconds += time.perf_counter() - started
+            self.tick()
+
+    def start(self) -> None:
+        if self._active or self.done:
+            return
+        self._active = True
+        self._started = time.perf_counter()
+        if self.mode == "cprofile":
+            # profiles the thread that calls start()/stop(), i.e. the loop driving the cycles
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = StackSampler(self.sample_interval)
+            self._sampler.start()
+        self._attach_readers()
+        if not self.torch_ops:
+            self._torch_status = "disabled"
+        elif "torch" not in sys.modules:
+            # never import torch just for profiling; the next run will have it once OCR has loaded
+            self._torch_status = "skipped: torch chưa được nạp khi bắt đầu profile"
+        else:
+            import torch
+
+            self._torch_ops = _TorchOpRecorder(torch)
+            self._torch_ops.start()
+            self._stages.ops = self._torch_ops
+            self._torch_status = self._torch_ops.mode
+
+    def watch(self, processor) -> None:
+        """Time the readers of ``processor``, including ones it loads later."""
+        self.processor = processor
+        if self._active:
+            self._attach_readers()
+
+    def _attach_readers(self) -> None:
+        # readers are created lazily on first use, so pick up new ones every cycle
+        if self.processor is not None:
+            for reader in self.processor.readers():
+                self._stages.attach(reader)
+
+    def tick(self) -> None:
+        """Count one finished cycle (for loops that do not use ``cycle()``)."""
+        if not self._active:
+            return
+        self._attach_readers()
+        self.completed += 1
+        if self.completed >= self.cycles:
+            self.stop()
+
+    def stop(self) -> Optional[Dict]:
+        if not self._active:
+            return self.summary
+        self._active = False
+        wall = time.perf_counter() - self._started
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        if self._torch_ops is not None:
+            self._torch_ops.stop()
+        self._stages.ops = None
+        self._stages.detach()
+        self.summary = self._dump(wall)
+        if self.on_done:
+            self.on_done(self.summary)
+        return self.summary
+
+    def _dump(self, wall: float) -> Dict:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stem = self.output_dir / f"profile_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        files: List[str] = []
+
+        if self._profile is not None:
+            prof_path = stem.with_suffix(".prof")
+            self._profile.dump_stats(str(prof_path))
+            text = io.StringIO()
+            pstats.Stats(self._profile, stream=text).sort_stats("cumulative").print_stats(40)
+            txt_path = stem.with_suffix(".txt")
+            txt_path.write_text(text.getvalue(), encoding="utf-8")
+            files += [str(prof_path), str(txt_path)]
+        if self._sampler is not None:
+            collapsed_path = stem.with_suffix(".collapsed")
+            self._sampler.write_collapsed(collapsed_path)
+            files.append(str(collapsed_path))
+        if self._torch_ops is not None:
+            files += self._torch_ops.write(stem)
+
+        busy = self._cycle_seconds or wall
+        detect = self._stages.seconds["detect"]
+        recognize = self._stages.seconds["recognize"]
+        summary = {
+            "mode": self.mode,
+            "cycles": self.completed,
+            "wall_s": wall,
+            "cycle_s": busy,
+            "mean_cycle_ms": 1000 * busy / max(1, self.completed),
+            "detect_s": detect,
+            "recognize_s": recognize,
+            "glue_s": max(0.0, busy - detect - recognize),
+            "stage_calls": dict(self._stages.calls),
+            "torch_ops": self._torch_status,
+            "samples": self._sampler.samples if self._sampler else None,
+            "files": files,
+        }
+        summary_path = Path(f"{stem}_summary.json")
+        summary_path.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+        summary["files"].append(str(summary_path))
+        return summary
@@ -0,0 +1,175 @@
+"""Fast serialization formats for ``OCRSessionResult`` streams.
+
+Three formats share one reader:
+
+* ``json``  – a single pretty-printed document (what ``latest_result.json`` uses).
+* ``jsonl`` – compact JSON, one result per line, for append-only logs.
+* ``bin``   – struct-packed, length-prefixed records after a ``OCRB`` file header.
+
+``read_results`` sniffs the format from the first bytes, so consumers never need
+to know which writer produced a file.
+"""
+
+import io
+import json
+import struct
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Union
+
+from ocr_pipeline import OCRBoxResult, OCRSessionResult
+
+BINARY_MAGIC = b"OCRB"
+BINARY_VERSION = 1
+FORMATS = ("json", "jsonl", "bin")
+
+_FILE_HEADER = struct.Struct("<4sB")
+_RECORD_LENGTH = struct.Struct("<I")
+# monitor_index, width, height, box count, capture_time length
+_SESSION_HEADER = struct.Struct("<iIIIH")
+# x1, y1, x2, y2, confidence, text length
+_BOX_HEADER = struct.Struct("<iiiidI")
+
+
+def encode_binary(result: OCRSessionResult) -> bytes:
+    """Pack one result into a binary record payload (without the length prefix)."""
+    capture_time = result.capture_time.encode("utf-8")
+    width, height = result.image_size
+    parts: List[bytes] = [
+        _SESSION_HEADER.pack(result.monitor_index, width, height, len(result.boxes), len(capture_time)),
+        capture_time,
+    ]
+    for box in result.boxes:
+        text = box.text.encode("utf-8")
+        x1, y1, x2, y2 = box.bbox
+        parts.append(_BOX_HEADER.pack(x1, y1, x2, y2, box.confidence, len(text)))
+        parts.append(text)
+    return b"".join(parts)
+
+
+def decode_binary(payload: bytes) -> OCRSessionResult:
+    """Unpack a record payload produced by ``encode_binary``."""
+    view = memoryview(payload)
+    monitor_index, width, height, box_count, time_len = _SESSION_HEADER.unpack_from(view, 0)
+    offset = _SESSION_HEADER.size
+    capture_time = bytes(view[offset:offset + time_len]).decode("utf-8")
+    offset += time_len
+    boxes: List[OCRBoxResult] = []
+    for _ in range(box_count):
+        x1, y1, x2, y2, confidence, text_len = _BOX_HEADER.unpack_from(view, offset)
+        offset += _BOX_HEADER.size
+        text = bytes(view[offset:offset + text_len]).decode("utf-8")
+        offset += text_len
+        boxes.append(OCRBoxResult(bbox=(x1, y1, x2, y2), text=text, confidence=confidence))
+    return OCRSessionResult(
+        capture_time=capture_time,
+        monitor_index=monitor_index,
+        image_size=(width, height),
+        boxes=boxes,
+    )
+
+
+def dumps(result: OCRSessionResult, fmt: str = "jsonl") -> bytes:
+    """Serialize a single result as a self-contained document in ``fmt``."""
+    if fmt == "json":
+        return result.to_json().encode("utf-8")
+    if fmt == "jsonl":
+        return result.to_json(compact=True).encode("utf-8") + b"\n"
+    if fmt == "bin":
+        payload = encode_binary(result)
+        return _FILE_HEADER.pack(BINARY_MAGIC, BINARY_VERSION) + _RECORD_LENGTH.pack(len(payload)) + payload
+    raise ValueError(f"Định dạng không hỗ trợ: {fmt} (chọn một trong {', '.join(FORMATS)})")
+
+
+def loads(data: bytes) -> List[OCRSessionResult]:
+    """Parse every result contained in ``data``, whatever format produced it."""
+    return list(_iter_stream(io.BytesIO(data)))
+
+
+def read_results(source: Union[str, Path, BinaryIO]) -> Iterator[OCRSessionResult]:
+    """Yield results from a file path or binary file object in any supported format."""
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as handle:
+            yield from _iter_stream(handle)
+    else:
+        yield from _iter_stream(source)
+
+
+def _iter_stream(handle: BinaryIO) -> Iterator[OCRSessionResult]:
+    head = handle.read(_FILE_HEADER.size)
+    if head[:4] == BINARY_MAGIC:
+        _, version = _FILE_HEADER.unpack(head)
+        if version != BINARY_VERSION:
+            raise ValueError(f"Phiên bản binary không hỗ trợ: {version}")
+        yield from _iter_binary_records(handle)
+        return
+
+    text = (head + handle.read()).decode("utf-8")
+    stripped = text.strip()
+    if not stripped:
+        return
+    try:
+        # a single (possibly pretty-printed) document such as latest_result.json
+        yield OCRSessionResult.from_dict(json.loads(stripped))
+        return
+    except json.JSONDecodeError:
+        pass
+    for line in stripped.splitlines():
+        if line.strip():
+            yield OCRSessionResult.from_dict(json.loads(line))
+
+
+def _iter_binary_records(handle: BinaryIO) -> Iterator[OCRSessionResult]:
+    while True:
+        prefix = handle.read(_RECORD_LENGTH.size)
+        if len(prefix) < _RECORD_LENGTH.size:
+            return
+        (length,) = _RECORD_LENGTH.unpack(prefix)
+        payload = handle.read(length)
+        if len(payload) < length:
+            # truncated tail from a writer that was killed mid-record
+            return
+        yield decode_binary(payload)
+
+
+class ResultStreamWriter:
+    """Append results to a ``jsonl`` or ``bin`` stream file.
+
+    The file handle stays open between writes; call ``flush`` when a reader must
+    see the records immediately, or use the writer as a context manager.
+    """
+
+    def __init__(self, path: Union[str, Path], fmt: str = "jsonl", append: bool = True) -> None:
+        if fmt not in ("jsonl", "bin"):
+            raise ValueError(f"Stream writer chỉ hỗ trợ jsonl hoặc bin, nhận: {fmt}")
+        self.path = Path(path)
+        self.fmt = fmt
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle: Optional[BinaryIO] = open(self.path, "ab" if append else "wb")
+        if fmt == "bin" and self._handle.tell() == 0:
+            self._handle.write(_FILE_HEADER.pack(BINARY_MAGIC, BINARY_VERSION))
+
+    def write(self, result: OCRSessionResult) -> None:
+        if self._handle is None:
+            raise ValueError("ResultStreamWriter đã đóng")
+        if self.fmt == "bin":
+            payload = encode_binary(result)
+            self._handle.write(_RECORD_LENGTH.pack(len(payload)))
+            self._handle.write(payload)
+        else:
+            self._handle.write(result.to_json(compact=True).encode("utf-8"))
+            self._handle.write(b"\n")
+
+    def flush(self) -> None:
+        if self._handle is not None:
+            self._handle.flush()
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def __enter__(self) -> "ResultStreamWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,151 @@
+"""Soak test: run the frame → crop → OCR → events path on synthetic input and
+check that memory stays flat.
+
+Synthetic 1080p frames are pushed through ``FrameBuffer`` at the chosen rate,
+boxes are cropped, results are diffed by ``ChangeTracker`` and appended with
+``ResultStreamWriter``. Without ``--ocr`` the box text is derived from the frame
+counter so the run needs no model; with ``--ocr`` every cycle goes through a
+real ``OCRProcessor``. RSS is sampled by ``MemoryGuard`` and the script fails
+when the growth over the second half of the run exceeds ``--max-growth-mb``::
+
+    python soak_test.py --minutes 240 --fps 30
+    python soak_test.py --minutes 30 --ocr --trace
+"""
+
+import argparse
+import datetime
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+from capture_manager import FrameBuffer
+from memory_guard import MemoryGuard
+from ocr_events import ChangeTracker
+from ocr_pipeline import OCRBoxResult, OCRProcessor, OCRSessionResult
+from result_format import ResultStreamWriter
+
+BOXES: List[Tuple[int, int, int, int]] = [(100, 100, 500, 180), (100, 300, 700, 380), (1400, 60, 1800, 140)]
+
+
+def synthetic_frame(seq: int, width: int, height: int, rng: np.random.Generator) -> np.ndarray:
+    frame = rng.integers(0, 40, size=(height, width, 3), dtype=np.uint8)
+    # a moving bright band so consecutive frames differ like real video
+    band = (seq * 8) % height
+    frame[band:band + 16, :, :] = 220
+    return frame
+
+
+def fake_result(seq: int, image_size: Tuple[int, int]) -> OCRSessionResult:
+    boxes = [
+        OCRBoxResult(bbox=BOXES[0], text=f"{seq // 30:06d}", confidence=0.99),
+        OCRBoxResult(bbox=BOXES[1], text=f"SCORE {seq // 300}", confidence=0.95),
+        OCRBoxResult(bbox=BOXES[2], text="LIVE", confidence=0.9),
+    ]
+    return OCRSessionResult(
+        capture_time=datetime.datetime.now().isoformat(),
+        monitor_index=0,
+        image_size=image_size,
+        boxes=boxes,
+    )
+
+
+def slope_mb_per_hour(samples: List[Tuple[float, float]]) -> float:
+    if len(samples) < 2:
+        return 0.0
+    times = np.array([t for t, _ in samples])
+    values = np.array([v for _, v in samples])
+    return float(np.polyfit(times, values, 1)[0]) * 3600
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=10.0)
+    parser.add_argument("--fps", type=float, default=30.0, help="tốc độ frame giả lập")
+    parser.add_argument("--ocr-interval", type=float, default=1.0, help="giây giữa hai chu kỳ OCR")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--ocr", action="store_true", help="chạy OCRProcessor thật trên các box")
+    parser.add_argument("--languages", nargs="+", default=["en"])
+    parser.add_argument("--trace", action="store_true", help="bật tracemalloc trong báo cáo")
+    parser.add_argument("--sample-interval", type=float, default=10.0)
+    parser.add_argument("--max-growth-mb", type=float, default=20.0)
+    parser.add_argument("--report", type=Path, default=Path("outputs") / "soak_memory.jsonl")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    buffer = FrameBuffer()
+    tracker = ChangeTracker()
+    processor = OCRProcessor(languages=args.languages) if args.ocr else None
+    guard = MemoryGuard(
+        check_interval=0.0,
+        report_interval=args.sample_interval,
+        report_path=args.report,
+        trace=args.trace,
+    )
+    stream_path = Path(tempfile.gettempdir()) / "ocr_soak_results.bin"
+    samples: List[Tuple[float, float]] = []
+    events = 0
+    seq = 0
+
+    started = time.monotonic()
+    deadline = started + args.minutes * 60
+    next_ocr = started
+    next_sample = started
+    with ResultStreamWriter(stream_path, fmt="bin", append=False) as writer:
+        while time.monotonic() < deadline:
+            tick = time.monotonic()
+            buffer.store(synthetic_frame(seq, args.width, args.height, rng), pts=seq / args.fps)
+
+            if tick >= next_ocr:
+                image = buffer.latest_image()
+                if processor:
+                    result = processor.run(image, BOXES, monitor_index=0)
+                else:
+                    # exercise the same crop allocations the OCR path makes
+                    for box in BOXES:
+                        np.asarray(image.crop(box))
+                    result = fake_result(seq, image.size)
+                events += len(tracker.update(result, pts=buffer.latest_pts))
+                writer.write(result)
+                next_ocr = tick + args.ocr_interval
+
+            if tick >= next_sample:
+                guard.check(force=True)
+                if guard.rss_mb is not None:
+                    samples.append((tick - started, guard.rss_mb))
+                    print(
+                        f"[{(tick - started) / 60:7.1f} min] frames={seq} events={events} "
+                        f"rss={guard.rss_mb:.1f} MB peak={guard.peak_rss_mb:.1f} MB",
+                        flush=True,
+                    )
+                next_sample = tick + args.sample_interval
+
+            seq += 1
+            time.sleep(max(0.0, 1.0 / args.fps - (time.monotonic() - tick)))
+
+    guard.write_report()
+    stream_path.unlink(missing_ok=True)
+    if len(samples) < 4:
+        print("Quá ít mẫu RSS để đánh giá; hãy chạy lâu hơn hoặc giảm --sample-interval.")
+        return 1
+
+    # ignore warm-up (allocator pools, first OCR model load) and judge the second half only
+    steady = samples[len(samples) // 2:]
+    growth = steady[-1][1] - steady[0][1]
+    print(
+        f"RSS {samples[0][1]:.1f} → {samples[-1][1]:.1f} MB | nửa sau tăng {growth:+.1f} MB "
+        f"({slope_mb_per_hour(steady):+.1f} MB/h) | giới hạn {args.max_growth_mb} MB"
+    )
+    if growth > args.max_growth_mb:
+        print("FAIL: bộ nhớ tăng liên tục")
+        return 1
+    print("PASS: bộ nhớ ổn định")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())